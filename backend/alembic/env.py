@@ -1,12 +1,11 @@
+import os
 from logging.config import fileConfig
 
-from sqlalchemy import engine_from_config
-from sqlalchemy import pool
-
 from alembic import context
 
-from backend.database import engine, Base
+from backend.database import DATABASE_URL, engine, make_engine, Base
 from backend.models import *
+from backend.models import DISH_SEARCH_TABLE
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -23,6 +22,18 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    # dish_search and its FTS5 shadow tables are created outside the ORM models
+    table = name if type_ == "table" else getattr(getattr(object, "table", None), "name", "")
+    return not (table or "").startswith(DISH_SEARCH_TABLE)
+
+
+# migrate the same database the app uses (DATABASE_URL, falling back to
+# sqlalchemy.url from alembic.ini only when it is not set)
+if "DATABASE_URL" in os.environ or not config.get_main_option("sqlalchemy.url"):
+    config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -45,6 +56,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -60,15 +72,13 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section, {}),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
+    # reuse the app's engine so SQLite gets the same pragmas (WAL, busy timeout)
+    url = config.get_main_option("sqlalchemy.url")
+    connectable = engine if url in (DATABASE_URL, None) else make_engine(url)
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,30 @@
+"""add menu lookup indexes
+
+Revision ID: 3b9e1f4a7c21
+Revises: ce14e08bf7d3
+Create Date: 2026-10-18 09:12:40.118524
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9e1f4a7c21'
+down_revision: Union[str, Sequence[str], None] = 'ce14e08bf7d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_Restaurant_Name', 'Restaurant', ['Name'], unique=True)
+    op.create_index('ix_Speisen_r_ID_Datum', 'Speisen', ['r_ID', 'Datum'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_Speisen_r_ID_Datum', table_name='Speisen')
+    op.drop_index('ix_Restaurant_Name', table_name='Restaurant')
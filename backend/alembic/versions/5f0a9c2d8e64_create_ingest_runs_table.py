@@ -0,0 +1,40 @@
+"""create ingest_runs table
+
+Revision ID: 5f0a9c2d8e64
+Revises: 8d2c6e0b5f13
+Create Date: 2026-10-18 12:03:51.274910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f0a9c2d8e64'
+down_revision: Union[str, Sequence[str], None] = '8d2c6e0b5f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ingest_runs',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('source', sa.String(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('page_count', sa.Integer(), nullable=True),
+    sa.Column('parse_duration', sa.Float(), nullable=True),
+    sa.Column('row_count', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_ingest_runs_source_created_at', 'ingest_runs', ['source', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ingest_runs_source_created_at', table_name='ingest_runs')
+    op.drop_table('ingest_runs')
@@ -0,0 +1,43 @@
+"""create price_stats_weekly table
+
+Fill it for existing dishes with `python -m backend.price_stats`.
+
+Revision ID: 7a3f5c1e0b48
+Revises: e2b7d9f14a86
+Create Date: 2026-10-18 19:58:13.460271
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3f5c1e0b48'
+down_revision: Union[str, Sequence[str], None] = 'e2b7d9f14a86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('price_stats_weekly',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('r_ID', sa.Integer(), nullable=False),
+    sa.Column('week', sa.Date(), nullable=False),
+    sa.Column('dish_count', sa.Integer(), nullable=False),
+    sa.Column('avg_preis', sa.Float(), nullable=False),
+    sa.Column('min_preis', sa.Float(), nullable=False),
+    sa.Column('max_preis', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['r_ID'], ['Restaurant.r_ID'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_price_stats_weekly_r_ID_week', 'price_stats_weekly', ['r_ID', 'week'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_price_stats_weekly_r_ID_week', table_name='price_stats_weekly')
+    op.drop_table('price_stats_weekly')
@@ -0,0 +1,33 @@
+"""unique dish per restaurant and day
+
+Revision ID: 8d2c6e0b5f13
+Revises: 3b9e1f4a7c21
+Create Date: 2026-10-18 10:41:07.502391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2c6e0b5f13'
+down_revision: Union[str, Sequence[str], None] = '3b9e1f4a7c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # earlier /update-menus runs appended the same dishes again; keep the newest copy
+    op.execute(
+        'DELETE FROM "Speisen" WHERE "s_ID" NOT IN '
+        '(SELECT MAX("s_ID") FROM "Speisen" GROUP BY "r_ID", "Datum", "Name")'
+    )
+    op.create_index('uq_Speisen_r_ID_Datum_Name', 'Speisen', ['r_ID', 'Datum', 'Name'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_Speisen_r_ID_Datum_Name', table_name='Speisen')
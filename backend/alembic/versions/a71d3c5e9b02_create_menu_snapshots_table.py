@@ -0,0 +1,43 @@
+"""create menu_snapshots table
+
+Snapshots for menus ingested before this revision can be backfilled with
+`python -m backend.snapshots`; until then /menu builds them on the fly.
+
+Revision ID: a71d3c5e9b02
+Revises: 5f0a9c2d8e64
+Create Date: 2026-10-18 15:27:12.640183
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a71d3c5e9b02'
+down_revision: Union[str, Sequence[str], None] = '5f0a9c2d8e64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('menu_snapshots',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('r_ID', sa.Integer(), nullable=False),
+    sa.Column('Datum', sa.Date(), nullable=False),
+    sa.Column('body', sa.LargeBinary(), nullable=False),
+    sa.Column('etag', sa.String(length=32), nullable=False),
+    sa.Column('source_hash', sa.String(length=64), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['r_ID'], ['Restaurant.r_ID'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_menu_snapshots_r_ID_Datum', 'menu_snapshots', ['r_ID', 'Datum'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_menu_snapshots_r_ID_Datum', table_name='menu_snapshots')
+    op.drop_table('menu_snapshots')
@@ -0,0 +1,29 @@
+"""add report to ingest_runs
+
+Revision ID: b5d1e7a93c20
+Revises: 7a3f5c1e0b48
+Create Date: 2026-10-18 21:14:36.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d1e7a93c20'
+down_revision: Union[str, Sequence[str], None] = '7a3f5c1e0b48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('ingest_runs', sa.Column('report', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('ingest_runs') as batch_op:
+        batch_op.drop_column('report')
@@ -0,0 +1,42 @@
+"""create Speisen_archive table
+
+Rows are moved here from Speisen by `python -m backend.retention`.
+
+Revision ID: c4e8a2f6d310
+Revises: a71d3c5e9b02
+Create Date: 2026-10-18 17:42:05.318847
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a2f6d310'
+down_revision: Union[str, Sequence[str], None] = 'a71d3c5e9b02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('Speisen_archive',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('s_ID', sa.Integer(), nullable=False),
+    sa.Column('Name', sa.String(), nullable=False),
+    sa.Column('Preis', sa.Float(), nullable=False),
+    sa.Column('Datum', sa.Date(), nullable=False),
+    sa.Column('r_ID', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['r_ID'], ['Restaurant.r_ID'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_Speisen_archive_r_ID_Datum', 'Speisen_archive', ['r_ID', 'Datum'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_Speisen_archive_r_ID_Datum', table_name='Speisen_archive')
+    op.drop_table('Speisen_archive')
@@ -0,0 +1,49 @@
+"""create dish_search index
+
+An FTS5 trigram table on SQLite, a pg_trgm GIN index on PostgreSQL. Fill it
+for existing dishes with `python -m backend.search`.
+
+Revision ID: e2b7d9f14a86
+Revises: c4e8a2f6d310
+Create Date: 2026-10-18 18:36:47.902115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7d9f14a86'
+down_revision: Union[str, Sequence[str], None] = 'c4e8a2f6d310'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_table('dish_search',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name_norm', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('preis', sa.Float(), nullable=False),
+        sa.Column('datum', sa.Date(), nullable=False),
+        sa.Column('r_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_dish_search_name_norm', 'dish_search', ['name_norm'], postgresql_using='gin', postgresql_ops={'name_norm': 'gin_trgm_ops'})
+        op.create_index('ix_dish_search_r_id_datum', 'dish_search', ['r_id', 'datum'])
+    else:
+        op.execute(
+            "CREATE VIRTUAL TABLE dish_search USING fts5("
+            "name_norm, name UNINDEXED, preis UNINDEXED, datum UNINDEXED, r_id UNINDEXED, "
+            "tokenize='trigram')"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE dish_search")
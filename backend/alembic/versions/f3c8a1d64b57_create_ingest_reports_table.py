@@ -0,0 +1,37 @@
+"""create ingest_reports table
+
+Revision ID: f3c8a1d64b57
+Revises: b5d1e7a93c20
+Create Date: 2026-10-19 10:12:05.381944
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c8a1d64b57'
+down_revision: Union[str, Sequence[str], None] = 'b5d1e7a93c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ingest_reports',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('wall', sa.Float(), nullable=False),
+    sa.Column('report', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_ingest_reports_started_at', 'ingest_reports', ['started_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ingest_reports_started_at', table_name='ingest_reports')
+    op.drop_table('ingest_reports')
@@ -1,12 +1,18 @@
-from backend.parsers.AugustinerParser import AugustinerParser
-from backend.scripts.scraper_augustiner import download_augustiner_menu
+from backend.orchestrator import run_ingest
+from backend.registry import RESTAURANTS
 
-def updateAugustiner():
+def updateAugustiner(profile: bool = False) -> dict | None:
     try:
-        download_augustiner_menu()
-        AugustinerParser("backend/menus/TageskarteAugustiner.pdf").run()
+        return run_ingest([RESTAURANTS["Augustiner"]], profile=profile)
     except Exception as e:
         print(f"[Update Error]{e}")
 
 if __name__ == "__main__":
-    updateAugustiner()
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Fetch, parse and store the Augustiner menu")
+    parser.add_argument("--profile", action="store_true", help="add cProfile and tracemalloc output to the report")
+    report = updateAugustiner(parser.parse_args().profile)
+    if report:
+        print(json.dumps(report, indent=2, default=str))
@@ -0,0 +1,63 @@
+"""Per-run cost of WeitblickParser's extraction, before and after the word index.
+
+"before" replays the old extraction path: one pymupdf.open() for the
+anchors, one for the rectangles, page.search_for() per weekday and
+page.get_textbox() per column. "after" is the current parser, which opens
+the document once and resolves everything from one word extraction.
+
+    python -m backend.benchmarks.bench_weitblick_parser [--runs N]
+"""
+import argparse
+import time
+from backend.parsers.WeitblickParser import WeitblickParser
+from backend.parsers.pdf_input import open_pymupdf
+from backend.benchmarks.synthetic import WEEKDAYS, make_wochenkarte
+
+
+def legacy_extract(parser: WeitblickParser) -> list[str]:
+    doc = open_pymupdf(parser.pdf)
+    page = doc[0]
+    all_y0, matches = [], []
+    for day in WEEKDAYS:
+        for match in page.search_for(day):
+            matches.append(match)
+            all_y0.append(match.y0)
+    avg_y0 = sum(all_y0) / len(all_y0)
+    anchors = [((m.x0 + m.x1) / 2, m.y1) for m in matches if -10 < (m.y0 - avg_y0) < 10]
+
+    doc = open_pymupdf(parser.pdf)
+    page = doc[0]
+    return [page.get_textbox(rect) for rect in parser.build_rects(anchors)]
+
+
+def current_extract(parser: WeitblickParser) -> list[str]:
+    parser.load_words()
+    return parser.read_rectangles(parser.build_rects(parser.get_anchors()))
+
+
+def time_runs(fn, pdf: bytes, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn(WeitblickParser(pdf, layout_cache=None))
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--runs", type=int, default=200)
+    args = arg_parser.parse_args()
+
+    pdf = make_wochenkarte()
+    parser = WeitblickParser(pdf, layout_cache=None)
+    before = parser.cleanup_menu(legacy_extract(parser))
+    after = parser.cleanup_menu(current_extract(WeitblickParser(pdf, layout_cache=None)))
+    print(f"identical menu: {before == after}")
+
+    before_ms = time_runs(legacy_extract, pdf, args.runs)
+    after_ms = time_runs(current_extract, pdf, args.runs)
+    print(f"before: {before_ms:.3f} ms/run")
+    print(f"after:  {after_ms:.3f} ms/run ({before_ms / after_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
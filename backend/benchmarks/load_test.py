@@ -0,0 +1,79 @@
+"""Closed-loop HTTP load test against a running API.
+
+    uvicorn backend.main:app --port 8000
+    python -m backend.benchmarks.load_test --url "http://127.0.0.1:8000/menu" --concurrency 64 --duration 10
+
+Each of `--concurrency` clients sends its next request as soon as the
+previous one returns. Prints requests per second and latency percentiles
+(and writes them as JSON with --output), so two builds can be compared at
+the same concurrency.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+import httpx
+
+
+async def client_loop(client: httpx.AsyncClient, urls: list[str], deadline: float, latencies: list, errors: list):
+    i = 0
+    while time.perf_counter() < deadline:
+        url = urls[i % len(urls)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            response = await client.get(url)
+            if response.status_code >= 500:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(urls: list[str], concurrency: int, duration: float) -> dict:
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        # warm up connections and caches
+        await asyncio.gather(*(client.get(url) for url in urls))
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(client_loop(client, urls, deadline, latencies, errors) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    pct = lambda p: round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 3)
+    return {
+        "urls": urls,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": pct(0.50),
+        "p90_ms": pct(0.90),
+        "p99_ms": pct(0.99),
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--url", action="append", required=True, help="repeat to rotate over several URLs")
+    arg_parser.add_argument("--concurrency", type=int, default=64)
+    arg_parser.add_argument("--duration", type=float, default=10.0)
+    arg_parser.add_argument("--output")
+    args = arg_parser.parse_args()
+
+    result = asyncio.run(run(args.url, args.concurrency, args.duration))
+    for key, value in result.items():
+        print(f"{key:<12} {value}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
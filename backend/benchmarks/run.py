@@ -0,0 +1,192 @@
+"""Time every ingest stage and the read endpoints on synthetic menus.
+
+    python -m backend.benchmarks.run [--sizes realistic stressed] [--repeat N] [--output FILE]
+
+Parsing stages run on PDFs from backend.benchmarks.synthetic, DB writes go
+to a throwaway SQLite database, and the FastAPI app is driven in-process.
+Results are written as JSON, tagged with the current commit, so runs can be
+diffed across commits.
+"""
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from sqlalchemy import text
+from backend.database import Base, SessionLocal, AsyncSessionLocal, make_engine, make_async_engine
+from backend.menu_writer import MenuWriter
+from backend.models import DISH_SEARCH_TABLE
+from backend.parsers.AugustinerParser import AugustinerParser, ENGINES
+from backend.parsers.WeitblickParser import WeitblickParser
+from backend.parsers.pdf_input import open_pymupdf
+from backend.benchmarks.synthetic import SIZES, make_tageskarte, make_wochenkarte
+
+
+def measure(fn, repeat: int) -> dict:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    return {
+        "runs": repeat,
+        "min_ms": round(min(durations), 4),
+        "median_ms": round(statistics.median(durations), 4),
+        "mean_ms": round(statistics.fmean(durations), 4),
+        "max_ms": round(max(durations), 4),
+    }
+
+
+def clear_menus():
+    db = SessionLocal()
+    try:
+        for table in reversed(Base.metadata.sorted_tables):
+            db.execute(table.delete())
+        db.execute(text(f"DELETE FROM {DISH_SEARCH_TABLE}"))
+        db.commit()
+    finally:
+        db.close()
+
+
+def bench_write(results: dict, prefix: str, restaurant: str, parsed, repeat: int):
+    def fresh_write():
+        clear_menus()
+        MenuWriter(restaurant).write(*parsed)
+
+    results[f"{prefix}.db_write_insert"] = measure(fresh_write, repeat)
+    results[f"{prefix}.db_write_unchanged"] = measure(lambda: MenuWriter(restaurant).write(*parsed), repeat)
+
+
+def bench_augustiner(results: dict, size: str, pdf: bytes, repeat: int):
+    for engine in ENGINES:
+        prefix = f"augustiner.{engine}.{size}"
+        parser = AugustinerParser(pdf, engine=engine)
+        if engine == "pymupdf":
+            results[f"{prefix}.open"] = measure(lambda: open_pymupdf(pdf).close(), repeat)
+            read = parser.read_pdf_pymupdf
+        else:
+            import pdfplumber
+            from backend.parsers.pdf_input import as_file
+
+            results[f"{prefix}.open"] = measure(lambda: pdfplumber.open(as_file(pdf)).close(), repeat)
+            read = parser.read_pdf_pdfplumber
+        # extract includes opening the document
+        results[f"{prefix}.extract"] = measure(read, repeat)
+        text = read()
+        results[f"{prefix}.clean_text"] = measure(lambda: parser.clean_text(text), repeat)
+        results[f"{prefix}.process_menu"] = measure(lambda: parser.process_menu(text), repeat)
+        menu = parser.process_menu(text)
+        results[f"{prefix}.to_dishes"] = measure(lambda: parser.to_dishes(menu), repeat)
+        results[f"{prefix}.parse_total"] = measure(parser.parse, repeat)
+    bench_write(results, f"augustiner.{size}", "Augustiner", AugustinerParser(pdf).parse(), repeat)
+    print("  augustiner done")
+
+
+def bench_weitblick(results: dict, size: str, pdf: bytes, repeat: int):
+    prefix = f"weitblick.{size}"
+    # never read or write the real layout cache; parse_total always detects the layout
+    parser = WeitblickParser(pdf, layout_cache=None)
+
+    def extract():
+        parser.load_words()
+        return parser.read_rectangles(parser.build_rects(parser.get_anchors()))
+
+    results[f"{prefix}.open"] = measure(lambda: open_pymupdf(pdf).close(), repeat)
+    # extract includes opening the document
+    results[f"{prefix}.extract"] = measure(extract, repeat)
+    day_menus = extract()
+    results[f"{prefix}.cleanup_menu"] = measure(lambda: parser.cleanup_menu(day_menus), repeat)
+    menu = parser.cleanup_menu(day_menus)
+    results[f"{prefix}.to_dishes"] = measure(lambda: parser.to_dishes(menu), repeat)
+    results[f"{prefix}.parse_total"] = measure(parser.parse, repeat)
+    with tempfile.TemporaryDirectory() as tmp:
+        layout_cache = Path(tmp) / "weitblick_layouts.json"
+        WeitblickParser(pdf, layout_cache=layout_cache).parse()
+        results[f"{prefix}.parse_cached_layout"] = measure(
+            lambda: WeitblickParser(pdf, layout_cache=layout_cache).parse(), repeat
+        )
+    bench_write(results, prefix, "Weitblick", parser.parse(), repeat)
+    print("  weitblick done")
+
+
+def bench_api(results: dict, size: str, tageskarte: bytes, wochenkarte: bytes, repeat: int):
+    from fastapi.testclient import TestClient
+    from backend.main import app, menu_cache
+
+    clear_menus()
+    MenuWriter("Augustiner").write(*AugustinerParser(tageskarte).parse())
+    MenuWriter("Weitblick").write(*WeitblickParser(wochenkarte, layout_cache=None).parse())
+    menu_cache.invalidate()
+
+    client = TestClient(app)
+    today = datetime.date.today().isoformat()
+    monday = (datetime.date.today() - datetime.timedelta(days=datetime.date.today().weekday())).isoformat()
+    routes = {
+        "menu_augustiner": f"/menu?restaurant_str=Augustiner&date_str={today}",
+        "menu_weitblick": f"/menu?restaurant_str=Weitblick&date_str={monday}",
+        "restaurants": "/restaurants",
+    }
+    for name, url in routes.items():
+        def cold():
+            menu_cache.invalidate()
+            client.get(url).raise_for_status()
+
+        results[f"api.{size}.{name}.cold"] = measure(cold, repeat)
+        results[f"api.{size}.{name}.warm"] = measure(lambda: client.get(url).raise_for_status(), repeat)
+    print("  api done")
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    arg_parser.add_argument("--output", default="bench_results.json")
+    args = arg_parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # never touch the real menu database
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        engine = make_engine(url)
+        Base.metadata.create_all(engine)
+        SessionLocal.configure(bind=engine)
+        AsyncSessionLocal.configure(bind=make_async_engine(url))
+
+        for size in args.sizes:
+            print(f"{size}:")
+            tageskarte = make_tageskarte(SIZES[size]["tageskarte"])
+            wochenkarte = make_wochenkarte(SIZES[size]["wochenkarte"])
+            bench_augustiner(results, size, tageskarte, args.repeat)
+            bench_weitblick(results, size, wochenkarte, args.repeat)
+            bench_api(results, size, tageskarte, wochenkarte, args.repeat)
+        engine.dispose()
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    width = max(map(len, results))
+    for name, stats in results.items():
+        print(f"{name:<{width}}  {stats['median_ms']:>9.3f} ms")
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Synthetic Tageskarte / Wochenkarte PDFs shaped like the real cards.
+
+The generated text goes through the same parsing rules as the real
+menus, so the benchmarks exercise every branch of the parsers.
+"""
+import pymupdf
+
+WEEKDAYS = ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag"]
+DISHES = [
+    "Schweinebraten mit Kartoffelknödel und Krautsalat",
+    "Käsespätzle mit Röstzwiebeln",
+    "Wiener Schnitzel vom Kalb mit Bratkartoffeln",
+    "Rindergulasch mit Semmelknödel",
+    "Gemüsecurry mit Basmatireis",
+    "Ofenfrische Leberkässemmel",
+    "Forelle Müllerin Art mit Petersilienkartoffeln",
+    "Linseneintopf mit Spätzle und Wiener Würstchen",
+]
+DRINKS = ["Spezi 0,5l", "Apfelschorle 0,5l", "Augustiner Hell 0,5l", "Tafelwasser 0,75l"]
+
+# dishes per card: Tageskarte lunch dishes, Wochenkarte dishes per weekday
+SIZES = {
+    "realistic": {"tageskarte": 8, "wochenkarte": 4},
+    "stressed": {"tageskarte": 80, "wochenkarte": 12},
+}
+
+
+def _price(n: int) -> str:
+    return f"{8 + n % 15},{(n * 37) % 100:02d} €"
+
+
+def make_tageskarte(dishes: int = 8) -> bytes:
+    doc = pymupdf.open()
+    font = pymupdf.Font("helv")
+    lines = ["Mittagstisch Montag 13.10.2025 11.30 bis 14.00 Uhr"]
+    lines += [f"{DISHES[n % len(DISHES)]} {n} {_price(n)}" for n in range(dishes)]
+    lines += ["Dazu empfehlen wir:"]
+    lines += [f"{DRINKS[n % len(DRINKS)]} {_price(n)}" for n in range(max(2, dishes // 4))]
+    lines += ["TAGESKARTE"]
+    lines += [f"{DISHES[n % len(DISHES)]} à la carte {_price(n + 5)}" for n in range(dishes)]
+
+    page, writer, y = None, None, 0
+    for line in lines:
+        if page is None or y > 800:
+            if writer:
+                writer.write_text(page)
+            page = doc.new_page(width=595, height=842)
+            writer, y = pymupdf.TextWriter(page.rect), 60
+        writer.append((50, y), line, font=font, fontsize=10)
+        y += 16
+    writer.write_text(page)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def make_wochenkarte(dishes_per_day: int = 4) -> bytes:
+    doc = pymupdf.open()
+    page = doc.new_page(width=842, height=595)
+    font = pymupdf.Font("helv")
+    writer = pymupdf.TextWriter(page.rect)
+    writer.append((300, 50), "Wochenkarte Weitblick", font=font, fontsize=20)
+    # everything has to fit between the weekday row and the parser's bottom edge
+    step = min(36, 360 / dishes_per_day)
+    size = min(9, step / 2.4)
+    for i, day in enumerate(WEEKDAYS):
+        x = 100 + i * 160
+        writer.append((x - 25, 100), day, font=font, fontsize=12)
+        y = 130
+        for n in range(dishes_per_day):
+            words = DISHES[(i + n) % len(DISHES)].split()
+            half = (len(words) + 1) // 2
+            writer.append((x - 70, y), " ".join(words[:half]), font=font, fontsize=size)
+            writer.append((x - 70, y + size * 1.3), f"{' '.join(words[half:])} {_price(n)}", font=font, fontsize=size)
+            y += step
+    writer.append((100, 560), "Alle Preise in Euro inkl. MwSt.", font=font, fontsize=8)
+    writer.write_text(page)
+    data = doc.tobytes()
+    doc.close()
+    return data
@@ -0,0 +1,165 @@
+"""Conditional responses and compression for the read endpoints.
+
+Handlers build their responses with `cached_response()`. It sets a strong
+ETag, Cache-Control and Last-Modified, and answers If-None-Match /
+If-Modified-Since with a bodyless 304. CompressionMiddleware then compresses
+larger bodies with brotli or gzip, depending on what the client accepts. It
+appends the coding to the ETag ("<etag>-br") so every representation keeps
+its own strong validator. `cached_response()` accepts those suffixed ETags
+too, and gives a 304 the ETag of the representation the client would have
+received. Every compressible response carries `Vary: Accept-Encoding`, so
+shared caches keep the representations apart.
+"""
+import gzip
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# days of a restaurant's current publication period (see registry.Cadence) can
+# still be re-ingested; days before it only ever move to /archive
+CACHE_CURRENT = "public, max-age=60, must-revalidate"
+CACHE_PAST = "public, max-age=86400"
+CACHE_RESTAURANTS = "public, max-age=3600"
+
+MIN_COMPRESS_SIZE = 1024
+COMPRESSIBLE_TYPES = (b"application/json", b"text/")
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # close to gzip -6 in speed, noticeably smaller output
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip().removeprefix("W/").strip('"')
+        if candidate == etag or candidate.rsplit("-", 1)[0] == etag:
+            return True
+    return False
+
+
+def http_date(moment: datetime) -> str:
+    # naive datetimes in the DB are local time
+    return format_datetime(moment.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+def not_modified(request: Request, etag: str, last_modified: datetime | None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return last_modified.astimezone(timezone.utc).replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def compressible(media_type: bytes, size: int, minimum_size: int = MIN_COMPRESS_SIZE) -> bool:
+    return size >= minimum_size and media_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def cached_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    cache_control: str,
+    last_modified: datetime | None = None,
+    media_type: str = "application/json",
+) -> Response:
+    headers = {"ETag": f'"{etag}"', "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if not_modified(request, etag, last_modified):
+        # bodyless, so CompressionMiddleware leaves it alone: name the representation here
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+        if encoding is not None and compressible(media_type.encode(), len(body)):
+            headers["ETag"] = f'"{etag}-{encoding}"'
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """Compresses complete response bodies of at least MIN_COMPRESS_SIZE bytes.
+
+    Streamed responses (more than one body message) are passed through as is.
+    """
+
+    def __init__(self, app, minimum_size: int = MIN_COMPRESS_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+        encoding = choose_encoding(accept)
+
+        start = None
+
+        async def send_wrapper(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if start is None:
+                return await send(message)
+            pending, start = start, None
+            headers = list(pending["headers"])
+            body = message.get("body", b"")
+            media_type = next((value for name, value in headers if name == b"content-type"), b"")
+            if media_type.startswith(COMPRESSIBLE_TYPES) and not any(
+                name == b"vary" and b"accept-encoding" in value.lower() for name, value in headers
+            ):
+                # uncompressed answers too: a shared cache must not hand them to a gzip client, or the reverse
+                headers.append((b"vary", b"Accept-Encoding"))
+            if (
+                encoding is None
+                or message.get("more_body")
+                or not compressible(media_type, len(body), self.minimum_size)
+                or any(name == b"content-encoding" for name, _ in headers)
+            ):
+                await send({**pending, "headers": headers})
+                return await send(message)
+
+            body = compress(body, encoding)
+            rewritten = []
+            for name, value in headers:
+                if name == b"content-length":
+                    value = str(len(body)).encode()
+                elif name == b"etag" and value.endswith(b'"'):
+                    value = value[:-1] + f'-{encoding}"'.encode()
+                rewritten.append((name, value))
+            rewritten.append((b"content-encoding", encoding.encode()))
+            await send({**pending, "headers": rewritten})
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_wrapper)
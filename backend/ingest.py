@@ -0,0 +1,92 @@
+"""Ingest worker: downloads, parses and stores menus, then applies retention.
+
+    python -m backend.ingest [RESTAURANT ...] [--profile] [--report FILE] [--events]
+
+Without restaurant names every registered restaurant is updated. The run
+report (see orchestrator.run_ingest) is written to FILE, or printed as JSON.
+The exit status is 1 if any restaurant failed.
+
+The API starts this as a subprocess for each update job, so the API
+processes never import PyMuPDF, pdfplumber or httpx. It passes `--events`:
+stdout then carries one JSON object per line, {"restaurant", "stage",
+"error"} for every stage change as it happens and {"report"} at the end,
+while everything else the run prints goes to stderr.
+"""
+import argparse
+import json
+import os
+import sys
+from backend.jobs import UpdateJob
+from backend.ingest_ledger import save_report
+from backend.orchestrator import run_ingest
+from backend.registry import RESTAURANTS
+from backend.retention import run_retention
+
+
+class EventJob(UpdateJob):
+    """An UpdateJob that also writes every stage change to `stream`."""
+
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
+
+    def stage(self, restaurant: str, stage: str, error: str | None = None):
+        super().stage(restaurant, stage, error)
+        emit(self.stream, {"restaurant": restaurant, "stage": stage, "error": error})
+
+
+def emit(stream, event: dict):
+    stream.write(json.dumps(event, default=str) + "\n")
+    stream.flush()
+
+
+def ingest(names: list[str] | None = None, profile: bool = False, job: UpdateJob | None = None) -> dict:
+    specs = [RESTAURANTS[name] for name in names] if names else RESTAURANTS.values()
+    report = run_ingest(specs, job, profile=profile)
+    try:
+        report["retention"] = run_retention()
+    except Exception as e:
+        # the menus are in; a failed archive run is retried after the next update
+        print(f"[Retention Error] {e}")
+        report["retention"] = {"error": str(e)}
+    if "id" in report:
+        try:
+            save_report(report, report["id"])
+        except Exception as e:
+            print(f"[Report Error] {e}")
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Fetch, parse and store menus")
+    parser.add_argument("restaurants", nargs="*", help=f"any of {', '.join(RESTAURANTS)}; defaults to all")
+    parser.add_argument("--profile", action="store_true", help="add cProfile and tracemalloc output to the report")
+    parser.add_argument("--report", help="write the JSON report to this file instead of stdout")
+    parser.add_argument("--events", action="store_true", help="stream stage changes and the report as JSON lines on stdout")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.restaurants if name not in RESTAURANTS]
+    if unknown:
+        parser.error(f"unknown restaurant: {', '.join(unknown)}")
+
+    events = None
+    if args.events:
+        # keep stdout for the events: everything else written to fd 1, by this
+        # process, its parse workers or the PDF libraries, goes to stderr
+        sys.stdout.flush()
+        events = os.fdopen(os.dup(1), "w")
+        os.dup2(2, 1)
+
+    report = ingest(args.restaurants, args.profile, EventJob(events) if events else None)
+    body = json.dumps(report, indent=2, default=str)
+    if events:
+        emit(events, {"report": report})
+    elif args.report:
+        with open(args.report, "w") as f:
+            f.write(body)
+    else:
+        print(body)
+    return 1 if any(entry.get("stage") == "failed" for entry in report["restaurants"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import datetime
+import hashlib
+import json
+from sqlalchemy import select, func
+from backend.database import SessionLocal
+from backend.models import IngestRun, IngestReport
+
+
+def document_info(content: bytes) -> tuple[str, int]:
+    """Content hash and page count of a document as downloaded."""
+    import pymupdf  # ingest only; the API uses the other functions here
+
+    with pymupdf.open(stream=content, filetype="pdf") as doc:
+        page_count = doc.page_count
+    return hashlib.sha256(content).hexdigest(), page_count
+
+
+def already_parsed(source: str, content_hash: str) -> bool:
+    db = SessionLocal()
+    try:
+        last_hash = db.execute(
+            select(IngestRun.content_hash)
+            .where(IngestRun.source == source, IngestRun.status == "parsed")
+            .order_by(IngestRun.created_at.desc(), IngestRun.id.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+    finally:
+        db.close()
+    return last_hash == content_hash
+
+
+def changed_since(source: str, since: datetime.datetime) -> bool:
+    """Whether a new document for `source` has been parsed since `since`."""
+    db = SessionLocal()
+    try:
+        return db.execute(
+            select(IngestRun.id)
+            .where(IngestRun.source == source, IngestRun.status == "parsed", IngestRun.created_at >= since)
+            .limit(1)
+        ).first() is not None
+    finally:
+        db.close()
+
+
+def last_parsed() -> dict[str, datetime.datetime]:
+    """When each source last had a document parsed."""
+    db = SessionLocal()
+    try:
+        return dict(
+            db.execute(
+                select(IngestRun.source, func.max(IngestRun.created_at))
+                .where(IngestRun.status == "parsed")
+                .group_by(IngestRun.source)
+            ).all()
+        )
+    finally:
+        db.close()
+
+
+def record_run(
+    source: str,
+    content_hash: str,
+    status: str,
+    page_count: int | None = None,
+    parse_duration: float | None = None,
+    row_count: int | None = None,
+    report: dict | None = None,
+) -> int:
+    db = SessionLocal()
+    try:
+        run = IngestRun(
+            source=source,
+            content_hash=content_hash,
+            status=status,
+            page_count=page_count,
+            parse_duration=parse_duration,
+            row_count=row_count,
+            report=json.dumps(report, default=str) if report is not None else None,
+            created_at=datetime.datetime.now(),
+        )
+        db.add(run)
+        db.commit()
+        return run.id
+    finally:
+        db.close()
+
+
+def save_report(report: dict, report_id: int | None = None) -> int:
+    """Store a run report, or replace the stored report `report_id`."""
+    db = SessionLocal()
+    try:
+        row = db.get(IngestReport, report_id) if report_id is not None else None
+        if row is None:
+            row = IngestReport(
+                started_at=datetime.datetime.fromisoformat(report["started_at"]),
+                created_at=datetime.datetime.now(),
+            )
+            db.add(row)
+        row.wall = report["wall"]
+        row.report = json.dumps(report, default=str)
+        db.commit()
+        return row.id
+    finally:
+        db.close()
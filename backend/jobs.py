@@ -0,0 +1,115 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+class UpdateJob:
+    """State of one /update-menus run, reported per restaurant."""
+
+    def __init__(self, names: list[str] | None = None):
+        self.id = uuid.uuid4().hex
+        self.names = names  # restaurants to update, None for all
+        self.status = "queued"  # queued → running → done | failed
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        self.restaurants = {}
+        self.report = None  # run_ingest's stage report, once it has finished
+        self.finished = threading.Event()
+        self._lock = threading.Lock()
+
+    def covers(self, names: list[str] | None) -> bool:
+        if self.names is None:
+            return True
+        return names is not None and set(names) <= set(self.names)
+
+    def stage(self, restaurant: str, stage: str, error: str | None = None):
+        """Move `restaurant` to `stage`, closing the timing of its previous stage."""
+        now = time.perf_counter()
+        with self._lock:
+            entry = self.restaurants.setdefault(restaurant, {"stage": None, "timings": {}, "error": None, "_since": now})
+            if entry["stage"] is not None:
+                entry["timings"][entry["stage"]] = round(now - entry["_since"], 4)
+            entry["stage"] = stage
+            entry["_since"] = now
+            if error is not None:
+                entry["error"] = error
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "names": self.names,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "error": self.error,
+                "restaurants": {
+                    name: {k: v for k, v in entry.items() if not k.startswith("_")}
+                    for name, entry in self.restaurants.items()
+                },
+                "report": self.report,
+            }
+
+
+class JobManager:
+    """Runs update jobs one at a time on a worker thread.
+
+    Submitting while a job is queued or running returns that job if it
+    covers the requested restaurants, so concurrent triggers never parse
+    twice. Otherwise the missing restaurants are added to the job queued
+    behind the running one, or a new job is queued for them.
+    """
+
+    def __init__(self, history: int = 50):
+        self.history = history
+        self._jobs = OrderedDict()
+        self._pending = []  # running job first, then at most one queued job
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="update-job")
+
+    def submit(self, fn, names: list[str] | None = None) -> tuple[UpdateJob, bool]:
+        """Queue `fn(job)` for `names` (None for all restaurants); `fn` must
+        update `job.names`. Returns the job and whether it was newly created."""
+        with self._lock:
+            for job in self._pending:
+                if job.covers(names):
+                    return job, False
+            queued = next((job for job in self._pending if job.status == "queued"), None)
+            if queued is not None:
+                # not started yet, so it can still take the missing restaurants
+                queued.names = None if names is None else list(dict.fromkeys([*queued.names, *names]))
+                return queued, False
+            job = UpdateJob(names)
+            self._pending.append(job)
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history:
+                self._jobs.popitem(last=False)
+        self._executor.submit(self._run, job, fn)
+        return job, True
+
+    def _run(self, job: UpdateJob, fn):
+        with self._lock:
+            # from here on submit() no longer changes job.names
+            job.status = "running"
+        job.started_at = datetime.now()
+        try:
+            fn(job)
+            job.status = "failed" if any(e["error"] for e in job.restaurants.values()) else "done"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now()
+            with self._lock:
+                self._pending.remove(job)
+            job.finished.set()
+
+    def get(self, job_id: str) -> UpdateJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
@@ -1,16 +1,52 @@
-from fastapi import FastAPI, Depends, HTTPException, Query, Header, BackgroundTasks
+from fastapi import FastAPI, Depends, HTTPException, Query, Header, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime, date
-from backend.database import SessionLocal
-from backend.models import Speisen, Restaurant
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+import asyncio
+import json
+import orjson
+import os
+import sys
+import threading
+import time
+from backend.http_cache import CompressionMiddleware, cached_response, CACHE_CURRENT, CACHE_PAST, CACHE_RESTAURANTS
+from backend.database import SessionLocal, AsyncSessionLocal, engine, async_engine
+from backend.ingest_ledger import last_parsed
+from backend.models import Speisen, SpeisenArchive, Restaurant
+from backend.jobs import JobManager, UpdateJob
+from backend.metrics import MetricsMiddleware, instrument_engine, register_cache, record_report, set_last_success
+from backend.price_stats import stats_query
+from backend.registry import RESTAURANTS
+from backend.scheduler import UpdateScheduler, period_start
+from backend.search import query_terms, search_query, MIN_TERM_LENGTH
+from backend.snapshots import snapshot_query, serialize_menu, make_etag
 from fastapi.middleware.cors import CORSMiddleware
-from backend.parsers.AugustinerParser import AugustinerParser
-from backend.parsers.WeitblickParser import WeitblickParser
-from backend.scripts.scraper_augustiner import download_augustiner_menu
-from backend.scripts.scraper_weitblick import download_weitblick_menu
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 import subprocess
 
-app = FastAPI(title="Speisekarten API")
+# set UPDATE_SCHEDULER=0 on all but one API worker
+UPDATE_SCHEDULER = os.environ.get("UPDATE_SCHEDULER", "1") != "0"
+update_scheduler = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global update_scheduler
+    try:
+        for source, moment in (await asyncio.to_thread(last_parsed)).items():
+            set_last_success(source, moment)
+    except Exception as e:
+        print(f"[Metrics Error] could not load last ingest times: {e}")
+    if UPDATE_SCHEDULER:
+        update_scheduler = UpdateScheduler(RESTAURANTS.values(), trigger_update)
+        update_scheduler.start()
+    yield
+    if update_scheduler:
+        await update_scheduler.stop()
+
+app = FastAPI(title="Speisekarten API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,25 +55,204 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
+# outermost, so the timings include CORS handling and compression
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-def run_all_updates():
+# Restaurant name → r_ID, so /menu only has to hit the Speisen index
+restaurant_ids: dict[str, int] = {}
+
+def refresh_restaurant_ids(db: Session):
+    """Sync variant for the ingest thread."""
+    global restaurant_ids
+    restaurant_ids = {name: r_id for r_id, name in db.execute(select(Restaurant.r_ID, Restaurant.Name))}
+
+async def refresh_restaurant_ids_async(db: AsyncSession):
+    global restaurant_ids
+    restaurant_ids = {name: r_id for r_id, name in await db.execute(select(Restaurant.r_ID, Restaurant.Name))}
+
+async def resolve_restaurant_id(db: AsyncSession, name: str) -> int | None:
+    if name not in restaurant_ids:
+        # restaurant may have been created by an ingest in another process
+        await refresh_restaurant_ids_async(db)
+    return restaurant_ids.get(name)
+
+async def resolve_names(db: AsyncSession, restaurant_str: list[str] | None) -> tuple[list[str], dict[int, str]]:
+    """The requested restaurant names (all if none were given) and their r_ID → name map; 400 on unknown names."""
+    if restaurant_str:
+        names = list(dict.fromkeys(restaurant_str))
+        unknown = [name for name in names if await resolve_restaurant_id(db, name) is None]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Invalid restaurant name: {', '.join(unknown)}")
+    else:
+        if not restaurant_ids:
+            await refresh_restaurant_ids_async(db)
+        names = sorted(restaurant_ids)
+    return names, {restaurant_ids[name]: name for name in names}
+
+def parse_date(value: str, name: str) -> date:
     try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name} format, use YYYY-MM-DD")
+
+class MenuCache:
+    """Bounded LRU/TTL cache for menu responses.
+
+    Entries are tagged with the generation they were loaded in; bumping the
+    generation after an ingest invalidates everything at once. Concurrent
+    misses on the same key wait for a single loader instead of each querying.
+
+    Lookups and loaders run on the event loop; the lock only guards against
+    invalidate() and stats() being called from the update job thread.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()  # key -> (generation, expires_at, value)
+        self._inflight = {}  # key -> [event, value, error]
+        self._lock = threading.Lock()
 
-        download_augustiner_menu()
-        download_weitblick_menu()
-        
-        AugustinerParser("backend/menus/TageskarteAugustiner.pdf").run()
-        WeitblickParser("backend/menus/Wochenkarte.pdf").run()
+    async def get_or_load(self, key, loader):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == self.generation and entry[1] > time.monotonic():
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[2]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                self.misses += 1
+                flight = [asyncio.Event(), None, None]
+                self._inflight[key] = flight
+            else:
+                self.coalesced += 1
+            generation = self.generation
 
+        if not leader:
+            await flight[0].wait()
+            if flight[2] is not None:
+                raise flight[2]
+            return flight[1]
+
+        try:
+            flight[1] = await loader()
+        except BaseException as e:
+            # cancellation included, so waiting requests are never left hanging
+            flight[2] = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                # a result loaded across an invalidation is not stored
+                if flight[2] is None and generation == self.generation:
+                    self._entries[key] = (generation, time.monotonic() + self.ttl, flight[1])
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.maxsize:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+            flight[0].set()
+        return flight[1]
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "generation": self.generation,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "coalesced": self.coalesced,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+menu_cache = MenuCache()
+register_cache(menu_cache)
+
+def json_entry(payload) -> tuple[bytes, str]:
+    """Body and ETag of a JSON response, serialized once when it is cached."""
+    body = orjson.dumps(payload)
+    return body, make_etag(body)
+
+update_jobs = JobManager()
+
+# upper bound for one `python -m backend.ingest` run
+INGEST_TIMEOUT = 15 * 60
+
+def run_all_updates(job: UpdateJob | None = None, names: list[str] | None = None):
+    """Run the ingest worker as a subprocess and fold its events and report into `job`.
+
+    Downloading and parsing never happen in the API process, which keeps
+    the PDF and HTTP libraries out of every API worker. The worker streams
+    each restaurant's stage changes on stdout (see backend.ingest), so
+    /update-menus/{job_id} shows them while the run is going.
+    """
+    job = job or UpdateJob()
+    names = names or list(RESTAURANTS)
+    for name in names:
+        job.stage(name, "ingesting")
+    try:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "backend.ingest", "--events", *names],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        watchdog = threading.Timer(INGEST_TIMEOUT, process.kill)
+        watchdog.start()
+        report = None
+        try:
+            for line in process.stdout:
+                event = json.loads(line)
+                if "report" in event:
+                    report = event["report"]
+                else:
+                    job.stage(event["restaurant"], event["stage"], event["error"])
+            process.wait()
+        finally:
+            watchdog.cancel()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+        if report is None:
+            raise RuntimeError(f"ingest worker exited without a report (exit status {process.returncode})")
+        job.report = report
+        record_report(report)
     except Exception as e:
         print(f"[Update Error] {e}")
+        raise
+    finally:
+        db = SessionLocal()
+        try:
+            refresh_restaurant_ids(db)
+        finally:
+            db.close()
+        menu_cache.invalidate()
+
+
+def trigger_update(names: list[str] | None = None) -> tuple[UpdateJob, bool]:
+    return update_jobs.submit(lambda job: run_all_updates(job, job.names), names)
 
 
 @app.get("/")
@@ -45,61 +260,259 @@ def root():
     return {"message": "Speisekarten API is running"}
 
 @app.get("/restaurants")
-def list_restaurants(db: Session = Depends(get_db)):
-    restaurants = db.query(Restaurant).all()
-    return [{"r_ID": r.r_ID, "Name": r.Name} for r in restaurants]
+async def list_restaurants(request: Request, db: AsyncSession = Depends(get_db)):
+    async def load():
+        restaurants = await db.execute(select(Restaurant.r_ID, Restaurant.Name))
+        return json_entry([{"r_ID": r_id, "Name": name} for r_id, name in restaurants])
+
+    body, etag = await menu_cache.get_or_load(("restaurants", None), load)
+    return cached_response(request, body, etag, CACHE_RESTAURANTS)
 
 @app.get("/menu")
-def get_menu_for_day(
+async def get_menu_for_day(
+    request: Request,
     date_str: str = Query(None, description="Date in YYYY-MM-DD format"),
     restaurant_str: str = Query(None, description="Restaurant name"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    if date_str:
-        try:
-            target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid date format, use YYYY-MM-DD")
-    else:
-        target_date = date.today()
+    target_date = parse_date(date_str, "date_str") if date_str else date.today()
 
     if restaurant_str:
-        restaurant = db.query(Restaurant).filter(Restaurant.Name == restaurant_str).first()
-        if not restaurant:
+        restaurant_name = restaurant_str
+        r_id = await resolve_restaurant_id(db, restaurant_name)
+        if r_id is None:
             raise HTTPException(status_code=400, detail=f"Invalid restaurant name: {restaurant_str}")
     else:
-        restaurant = db.query(Restaurant).filter(Restaurant.Name == "Augustiner").first()
-        if not restaurant:
+        restaurant_name = "Augustiner"
+        r_id = await resolve_restaurant_id(db, restaurant_name)
+        if r_id is None:
             raise HTTPException(status_code=404, detail="Default restaurant 'Augustiner' not found")
 
-    dishes = (
-        db.query(Speisen, Restaurant)
-        .join(Restaurant, Speisen.r_ID == Restaurant.r_ID)
-        .filter(Speisen.Datum == target_date)
-        .filter(Restaurant.r_ID == restaurant.r_ID)
-        .order_by(Restaurant.Name)
-        .all()
+    async def load() -> tuple[bytes, str, datetime | None] | None:
+        snapshot = (await db.execute(snapshot_query(r_id, target_date))).first()
+        if snapshot:
+            return snapshot.body, snapshot.etag, snapshot.created_at
+        # not materialized (ingested before snapshots existed): build it from
+        # Speisen, served entirely by ix_Speisen_r_ID_Datum
+        rows = (await db.execute(
+            select(Speisen.s_ID, Speisen.Name, Speisen.Preis, Speisen.Datum)
+            .where(Speisen.r_ID == r_id, Speisen.Datum == target_date)
+            .order_by(Speisen.s_ID)
+        )).all()
+        if not rows:
+            return None
+        body = serialize_menu(rows, r_id, restaurant_name)
+        return body, make_etag(body), None
+
+    # empty days are cached too, so a burst of 404s costs one query
+    entry = await menu_cache.get_or_load((r_id, target_date), load)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"No dishes found for {restaurant_name} on {target_date}")
+
+    body, etag, last_modified = entry
+    cache_control = cache_control_for([restaurant_name], target_date)
+    return cached_response(request, body, etag, cache_control, last_modified)
+
+def cache_control_for(names, last_day: date) -> str:
+    """CACHE_PAST only if `last_day` lies before the period each restaurant may still re-ingest."""
+    now = datetime.now()
+    for name in names:
+        spec = RESTAURANTS.get(name)
+        # a weekly card is re-parsed until the week is over, earlier days included
+        period = period_start(spec.cadence, now).date() if spec else now.date()
+        if last_day >= period:
+            return CACHE_CURRENT
+    return CACHE_PAST
+
+MAX_RANGE_DAYS = 62
+
+@app.get("/menus")
+async def get_menus_for_range(
+    request: Request,
+    start_str: str = Query(None, description="First day in YYYY-MM-DD format, defaults to today"),
+    end_str: str = Query(None, description="Last day in YYYY-MM-DD format, defaults to start"),
+    restaurant_str: list[str] = Query(None, description="Restaurant names, repeat for several; defaults to all"),
+    db: AsyncSession = Depends(get_db)
+):
+    start = parse_date(start_str, "start_str") if start_str else date.today()
+    end = parse_date(end_str, "end_str") if end_str else start
+    if end < start:
+        raise HTTPException(status_code=400, detail="end_str is before start_str")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {MAX_RANGE_DAYS} days")
+
+    names, ids = await resolve_names(db, restaurant_str)
+
+    async def load():
+        # one range scan per restaurant on ix_Speisen_r_ID_Datum, in a single query
+        dishes = await db.execute(
+            select(Speisen.s_ID, Speisen.Name, Speisen.Preis, Speisen.Datum, Speisen.r_ID)
+            .where(Speisen.r_ID.in_(ids), Speisen.Datum.between(start, end))
+            .order_by(Speisen.r_ID, Speisen.Datum, Speisen.s_ID)
+        )
+        grouped = {name: {} for name in names}
+        for s_id, dish_name, preis, datum, r_id in dishes:
+            name = ids[r_id]
+            grouped[name].setdefault(datum.isoformat(), []).append(
+                {
+                    "s_ID": s_id,
+                    "Name": dish_name,
+                    "Preis": preis,
+                    "Datum": datum,
+                    "r_ID": r_id,
+                    "Restaurant": name,
+                }
+            )
+        return json_entry({"start": start, "end": end, "restaurants": grouped})
+
+    body, etag = await menu_cache.get_or_load(("range", tuple(names), start, end), load)
+    cache_control = cache_control_for(names, end)
+    return cached_response(request, body, etag, cache_control)
+
+MAX_ARCHIVE_DAYS = 366
+
+@app.get("/archive")
+async def get_archived_menus(
+    start_str: str = Query(..., description="First day in YYYY-MM-DD format"),
+    end_str: str = Query(None, description="Last day in YYYY-MM-DD format, defaults to start"),
+    restaurant_str: str = Query(None, description="Restaurant name, defaults to all"),
+    db: AsyncSession = Depends(get_db)
+):
+    start = parse_date(start_str, "start_str")
+    end = parse_date(end_str, "end_str") if end_str else start
+    if end < start:
+        raise HTTPException(status_code=400, detail="end_str is before start_str")
+    if (end - start).days >= MAX_ARCHIVE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {MAX_ARCHIVE_DAYS} days")
+
+    query = (
+        select(SpeisenArchive.s_ID, SpeisenArchive.Name, SpeisenArchive.Preis, SpeisenArchive.Datum, Restaurant.r_ID, Restaurant.Name)
+        .join(Restaurant, Restaurant.r_ID == SpeisenArchive.r_ID)
+        .where(SpeisenArchive.Datum.between(start, end))
+        .order_by(Restaurant.Name, SpeisenArchive.Datum, SpeisenArchive.s_ID)
     )
+    if restaurant_str:
+        r_id = await resolve_restaurant_id(db, restaurant_str)
+        if r_id is None:
+            raise HTTPException(status_code=400, detail=f"Invalid restaurant name: {restaurant_str}")
+        query = query.where(SpeisenArchive.r_ID == r_id)
 
-    if not dishes:
-        raise HTTPException(status_code=404, detail=f"No dishes found for {restaurant.Name} on {target_date}")
+    # history is read rarely and in large ranges; keep it out of menu_cache
+    grouped = {}
+    for s_id, dish_name, preis, datum, r_id, name in await db.execute(query):
+        grouped.setdefault(name, {}).setdefault(datum.isoformat(), []).append(
+            {
+                "s_ID": s_id,
+                "Name": dish_name,
+                "Preis": preis,
+                "Datum": datum,
+                "r_ID": r_id,
+                "Restaurant": name,
+            }
+        )
+    return {"start": start, "end": end, "restaurants": grouped}
 
-    return [
+MAX_SEARCH_RESULTS = 200
+
+@app.get("/search")
+async def search_dishes(
+    q: str = Query(..., description="Words to look for in dish names, e.g. 'Schweinebraten' or 'braten knödel'"),
+    start_str: str = Query(None, description="First day in YYYY-MM-DD format"),
+    end_str: str = Query(None, description="Last day in YYYY-MM-DD format"),
+    restaurant_str: str = Query(None, description="Restaurant name"),
+    limit: int = Query(50, ge=1, le=MAX_SEARCH_RESULTS),
+    db: AsyncSession = Depends(get_db)
+):
+    terms = query_terms(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail=f"Search terms need at least {MIN_TERM_LENGTH} characters")
+    start = parse_date(start_str, "start_str") if start_str else None
+    end = parse_date(end_str, "end_str") if end_str else None
+    r_id = None
+    if restaurant_str:
+        r_id = await resolve_restaurant_id(db, restaurant_str)
+        if r_id is None:
+            raise HTTPException(status_code=400, detail=f"Invalid restaurant name: {restaurant_str}")
+    if not restaurant_ids:
+        await refresh_restaurant_ids_async(db)
+    names = {r_id: name for name, r_id in restaurant_ids.items()}
+
+    stmt, params = search_query(db.bind.dialect.name, terms, start, end, r_id, limit)
+    results = [
         {
-            "s_ID": s.s_ID,
-            "Name": s.Name,
-            "Preis": s.Preis,
-            "Datum": s.Datum,
-            "r_ID": r.r_ID,
-            "Restaurant": r.Name,
+            "Name": name,
+            "Preis": preis,
+            "Datum": datum,
+            "r_ID": dish_r_id,
+            "Restaurant": names.get(dish_r_id),
+            "score": score,
         }
-        for s, r in dishes
+        for name, preis, datum, dish_r_id, score in await db.execute(stmt, params)
     ]
+    return {"query": q, "terms": terms, "results": results}
+
+@app.get("/stats")
+async def get_price_stats(
+    request: Request,
+    start_str: str = Query(None, description="First day in YYYY-MM-DD format"),
+    end_str: str = Query(None, description="Last day in YYYY-MM-DD format"),
+    restaurant_str: list[str] = Query(None, description="Restaurant names, repeat for several; defaults to all"),
+    db: AsyncSession = Depends(get_db)
+):
+    start = parse_date(start_str, "start_str") if start_str else None
+    end = parse_date(end_str, "end_str") if end_str else None
+    if start and end and end < start:
+        raise HTTPException(status_code=400, detail="end_str is before start_str")
 
-@app.post("/update-menus")
-def update_menus(background_tasks: BackgroundTasks, x_api_key: str = Header(None)):
+    names, ids = await resolve_names(db, restaurant_str)
+
+    async def load():
+        # precomputed per week by the ingest, see backend.price_stats
+        weeks = {name: [] for name in names}
+        for r_id, week, dish_count, avg_preis, min_preis, max_preis in await db.execute(stats_query(ids, start, end)):
+            weeks[ids[r_id]].append(
+                {
+                    "week": week,
+                    "dishes": dish_count,
+                    "avg": avg_preis,
+                    "min": min_preis,
+                    "max": max_preis,
+                }
+            )
+        return json_entry({"start": start, "end": end, "restaurants": weeks})
+
+    body, etag = await menu_cache.get_or_load(("stats", tuple(names), start, end), load)
+    return cached_response(request, body, etag, CACHE_CURRENT)
+
+@app.get("/cache-stats")
+async def cache_stats():
+    return menu_cache.stats()
+
+@app.get("/metrics")
+def metrics():
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+@app.post("/update-menus", status_code=202)
+def update_menus(x_api_key: str = Header(None)):
     if x_api_key != "super-secret-key":
         raise HTTPException(status_code=403, detail="forbidden")
 
-    run_all_updates()
-    return {"status": "update started"}
+    job, created = trigger_update()
+    if created:
+        status = "update started" if job.status != "queued" else "update queued"
+    else:
+        status = "update already running" if job.status == "running" else "update already queued"
+    return {"status": status, "job_id": job.id}
+
+@app.get("/update-schedule")
+def update_schedule():
+    if not update_scheduler:
+        return {"enabled": False, "restaurants": {}}
+    return {"enabled": True, "restaurants": update_scheduler.status()}
+
+@app.get("/update-menus/{job_id}")
+def update_status(job_id: str):
+    job = update_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job.to_dict()
@@ -0,0 +1,102 @@
+import datetime
+from sqlalchemy import select, delete
+from sqlalchemy.orm import Session
+from backend.database import SessionLocal
+from backend.models import Speisen, Restaurant
+from backend.price_stats import update_weeks
+from backend.search import index_dishes
+from backend.snapshots import materialize
+
+
+def _insert_for(db: Session):
+    # INSERT ... ON CONFLICT is dialect specific in SQLAlchemy
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+class MenuWriter:
+    """Syncs a parsed menu into Speisen for one restaurant and date range.
+
+    Rows are identified by (r_ID, Datum, Name). Only new or re-priced dishes
+    are upserted and dishes that vanished from the card are deleted, so
+    re-running an update never duplicates rows. The /menu snapshots, the
+    search index and the weekly price stats of the range are rebuilt in the
+    same transaction.
+    """
+
+    def __init__(self, restaurant_name: str):
+        self.restaurant_name = restaurant_name
+
+    def get_or_create_restaurant(self, db: Session) -> int:
+        insert = _insert_for(db)
+        db.execute(insert(Restaurant).values(Name=self.restaurant_name).on_conflict_do_nothing(index_elements=["Name"]))
+        return db.execute(select(Restaurant.r_ID).where(Restaurant.Name == self.restaurant_name)).scalar_one()
+
+    def write(
+        self,
+        dishes: list[tuple[datetime.date, str, float]],
+        start: datetime.date,
+        end: datetime.date,
+        source_hash: str | None = None,
+    ) -> dict[str, int]:
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+        if not dishes:
+            # an empty parse is far more likely a broken card than an empty week
+            print(f"No dishes parsed for {self.restaurant_name}, keeping stored menu")
+            return counts
+
+        wanted = {}
+        for datum, name, price in dishes:
+            wanted[(datum, name)] = round(price, 2)
+
+        db = SessionLocal()
+        try:
+            r_id = self.get_or_create_restaurant(db)
+            stored = {
+                (datum, name): (s_id, preis)
+                for s_id, datum, name, preis in db.execute(
+                    select(Speisen.s_ID, Speisen.Datum, Speisen.Name, Speisen.Preis)
+                    .where(Speisen.r_ID == r_id, Speisen.Datum.between(start, end))
+                )
+            }
+
+            upserts = []
+            for (datum, name), price in wanted.items():
+                if (datum, name) not in stored:
+                    counts["inserted"] += 1
+                elif round(stored[(datum, name)][1], 2) != price:
+                    counts["updated"] += 1
+                else:
+                    counts["unchanged"] += 1
+                    continue
+                upserts.append({"Name": name, "Preis": price, "Datum": datum, "r_ID": r_id})
+
+            stale = [s_id for key, (s_id, _) in stored.items() if key not in wanted]
+            counts["deleted"] = len(stale)
+
+            if upserts:
+                insert = _insert_for(db)
+                stmt = insert(Speisen)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["r_ID", "Datum", "Name"],
+                    set_={"Preis": stmt.excluded.Preis},
+                )
+                db.execute(stmt, upserts)
+            if stale:
+                db.execute(delete(Speisen).where(Speisen.s_ID.in_(stale)))
+            # snapshots commit together with the dishes they were built from
+            materialize(db, r_id, self.restaurant_name, start, end, source_hash)
+            index_dishes(db, r_id, start, end)
+            update_weeks(db, r_id, start, end)
+            db.commit()
+        finally:
+            db.close()
+
+        print(
+            f"{self.restaurant_name}: {counts['inserted']} inserted, {counts['updated']} updated, "
+            f"{counts['unchanged']} unchanged, {counts['deleted']} deleted"
+        )
+        return counts
@@ -0,0 +1,165 @@
+"""Prometheus metrics, served by /metrics.
+
+Everything here is an in-process counter or histogram update, cheap enough to
+stay on in production: requests are timed by a plain ASGI middleware, SQL
+statements by two engine events, and the cache numbers are read from
+MenuCache.stats() only when /metrics is scraped.
+
+With several uvicorn workers every process keeps its own numbers; scrape them
+individually or set up prometheus_client's multiprocess mode.
+"""
+import contextvars
+import time
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import REGISTRY
+from sqlalchemy import event
+
+REQUEST_DURATION = Histogram(
+    "speiseplan_http_request_duration_seconds",
+    "Time spent handling a request",
+    ["method", "route", "status"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+REQUEST_QUERIES = Histogram(
+    "speiseplan_db_queries_per_request",
+    "SQL statements executed while handling a request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50),
+)
+REQUEST_QUERY_DURATION = Histogram(
+    "speiseplan_db_query_duration_per_request_seconds",
+    "Total time spent in SQL statements while handling a request",
+    ["route"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5),
+)
+DOWNLOAD_BYTES = Counter(
+    "speiseplan_ingest_download_bytes",
+    "Bytes of menu documents downloaded",
+    ["source"],
+)
+DOWNLOAD_DURATION = Histogram(
+    "speiseplan_ingest_download_duration_seconds",
+    "Time to download a menu document, 304s included",
+    ["source"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+STAGE_DURATION = Histogram(
+    "speiseplan_ingest_stage_duration_seconds",
+    "Wall time of each ingest stage per restaurant",
+    ["source", "stage"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+LAST_SUCCESS = Gauge(
+    "speiseplan_ingest_last_success_timestamp_seconds",
+    "Unix time a new menu document was last parsed and stored",
+    ["source"],
+)
+
+
+class RequestStats:
+    __slots__ = ("queries", "query_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+
+
+# the stats of the request being handled; statements outside requests are not counted
+current_request = contextvars.ContextVar("current_request", default=None)
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start"].pop()
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_time += time.perf_counter() - started
+
+
+def instrument_engine(engine):
+    """Count the statements of `engine` (for async engines pass `.sync_engine`)."""
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
+
+
+class MetricsMiddleware:
+    """Times every HTTP request, labelled with its route template rather than the raw path."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+        stats = RequestStats()
+        token = current_request.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            current_request.reset(token)
+            route = scope.get("route")
+            # unmatched paths share one label so scanners cannot blow up the series count
+            path = route.path if route is not None else "unmatched"
+            REQUEST_DURATION.labels(scope["method"], path, str(status)).observe(duration)
+            REQUEST_QUERIES.labels(path).observe(stats.queries)
+            REQUEST_QUERY_DURATION.labels(path).observe(stats.query_time)
+
+
+class CacheCollector:
+    """Exposes a MenuCache's counters at scrape time."""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def collect(self):
+        stats = self.cache.stats()
+        for name in ("hits", "misses", "coalesced", "evictions"):
+            counter = CounterMetricFamily(f"speiseplan_cache_{name}", f"Menu cache {name}")
+            counter.add_metric([], stats[name])
+            yield counter
+        size = GaugeMetricFamily("speiseplan_cache_entries", "Entries in the menu cache")
+        size.add_metric([], stats["size"])
+        yield size
+        hit_rate = GaugeMetricFamily("speiseplan_cache_hit_rate", "Menu cache hits per lookup since start")
+        hit_rate.add_metric([], stats["hit_rate"])
+        yield hit_rate
+
+
+def register_cache(cache):
+    REGISTRY.register(CacheCollector(cache))
+
+
+def record_report(report: dict):
+    """Download, stage and last-success metrics from an ingest report (see orchestrator.run_ingest)."""
+    now = time.time()
+    for name, entry in report["restaurants"].items():
+        download = entry.get("download")
+        if download:
+            DOWNLOAD_BYTES.labels(name).inc(download["bytes"])
+            DOWNLOAD_DURATION.labels(name).observe(download["wall"])
+        for stage, record in entry["stages"].items():
+            STAGE_DURATION.labels(name, stage).observe(record["wall"])
+        # same meaning as the value seeded from ingest_ledger.last_parsed() at startup:
+        # checks that found nothing new (not_modified, unchanged, empty) do not count
+        if entry.get("stage") == "parsed":
+            LAST_SUCCESS.labels(name).set(now)
+
+
+def set_last_success(source: str, moment):
+    LAST_SUCCESS.labels(source).set(moment.timestamp())
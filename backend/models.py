@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Float, Date, DateTime, LargeBinary, ForeignKey, Index, event
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -12,6 +12,10 @@ class Restaurant(Base):
     # Relationship: one restaurant → many dishes
     speisen = relationship("Speisen", back_populates="restaurant", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_Restaurant_Name", "Name", unique=True),
+    )
+
 
 class Speisen(Base):
     __tablename__ = "Speisen"
@@ -25,3 +29,129 @@ class Speisen(Base):
     # Relationship: link back to the parent restaurant
     restaurant = relationship("Restaurant", back_populates="speisen")
 
+    # /menu looks up one restaurant on one day → range scan on (r_ID, Datum)
+    __table_args__ = (
+        Index("ix_Speisen_r_ID_Datum", "r_ID", "Datum"),
+        # upsert target for MenuWriter
+        Index("uq_Speisen_r_ID_Datum_Name", "r_ID", "Datum", "Name", unique=True),
+    )
+
+
+class IngestRun(Base):
+    __tablename__ = "ingest_runs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    source = Column(String, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    status = Column(String, nullable=False)  # "parsed", "empty" (no dishes found) or "failed"
+    page_count = Column(Integer)
+    parse_duration = Column(Float)  # seconds
+    row_count = Column(Integer)
+    report = Column(Text)  # JSON stage report, see backend.profiling
+    created_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_ingest_runs_source_created_at", "source", "created_at"),
+    )
+
+
+class IngestReport(Base):
+    """The full report of one ingest run (see orchestrator.run_ingest), whatever each source's outcome."""
+
+    __tablename__ = "ingest_reports"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    started_at = Column(DateTime, nullable=False)
+    wall = Column(Float, nullable=False)  # seconds
+    report = Column(Text, nullable=False)  # JSON
+    created_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_ingest_reports_started_at", "started_at"),
+    )
+
+
+class MenuSnapshot(Base):
+    __tablename__ = "menu_snapshots"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    r_ID = Column(Integer, ForeignKey("Restaurant.r_ID"), nullable=False)
+    Datum = Column(Date, nullable=False)
+    body = Column(LargeBinary, nullable=False)  # final /menu JSON
+    etag = Column(String(32), nullable=False)
+    source_hash = Column(String(64))  # ingest_runs.content_hash of the document it came from
+    created_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("uq_menu_snapshots_r_ID_Datum", "r_ID", "Datum", unique=True),
+    )
+
+
+class SpeisenArchive(Base):
+    """Speisen rows older than the retention window, moved by backend.retention."""
+
+    __tablename__ = "Speisen_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    s_ID = Column(Integer, nullable=False)  # as it was in Speisen; SQLite may reuse it later
+    Name = Column(String, nullable=False)
+    Preis = Column(Float, nullable=False)
+    Datum = Column(Date, nullable=False)
+    r_ID = Column(Integer, ForeignKey("Restaurant.r_ID"), nullable=False)
+    archived_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_Speisen_archive_r_ID_Datum", "r_ID", "Datum"),
+    )
+
+
+class WeeklyPriceStats(Base):
+    """Per restaurant and week (starting Monday), maintained by backend.price_stats."""
+
+    __tablename__ = "price_stats_weekly"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    r_ID = Column(Integer, ForeignKey("Restaurant.r_ID"), nullable=False)
+    week = Column(Date, nullable=False)
+    dish_count = Column(Integer, nullable=False)
+    avg_preis = Column(Float, nullable=False)
+    min_preis = Column(Float, nullable=False)
+    max_preis = Column(Float, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("uq_price_stats_weekly_r_ID_week", "r_ID", "week", unique=True),
+    )
+
+
+# dish_search (see backend.search) is an FTS5 virtual table on SQLite, which the
+# ORM cannot declare; it is created next to the mapped tables by these hooks, so
+# Base.metadata.create_all() builds a complete schema. Migration e2b7d9f14a86
+# creates the same table, and alembic's autogenerate skips it (env.py).
+DISH_SEARCH_TABLE = "dish_search"
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_dish_search(target, connection, **kw):
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        connection.exec_driver_sql(
+            "CREATE TABLE IF NOT EXISTS dish_search ("
+            "id SERIAL PRIMARY KEY, name_norm VARCHAR NOT NULL, name VARCHAR NOT NULL, "
+            "preis FLOAT NOT NULL, datum DATE NOT NULL, r_id INTEGER NOT NULL)"
+        )
+        connection.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_dish_search_name_norm ON dish_search USING gin (name_norm gin_trgm_ops)"
+        )
+        connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_dish_search_r_id_datum ON dish_search (r_id, datum)")
+    else:
+        connection.exec_driver_sql(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS dish_search USING fts5("
+            "name_norm, name UNINDEXED, preis UNINDEXED, datum UNINDEXED, r_id UNINDEXED, "
+            "tokenize='trigram')"
+        )
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def drop_dish_search(target, connection, **kw):
+    connection.exec_driver_sql("DROP TABLE IF EXISTS dish_search")
@@ -0,0 +1,189 @@
+import datetime
+import math
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from backend.jobs import UpdateJob
+from backend.ingest_ledger import document_info, already_parsed, record_run, save_report
+from backend.menu_writer import MenuWriter
+from backend.profiling import IngestProfile
+from backend.registry import RestaurantSpec
+from backend.scripts.fetcher import STATE_FILE, fetch_all_sync, remember_validators
+
+MAX_PARSE_WORKERS = 4
+
+
+class ParseTimeout(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise ParseTimeout("parse timed out")
+
+
+def _init_worker(share: int):
+    from backend.parsers import pdf_input
+
+    pdf_input.cpu_share = share
+
+
+def parse_in_worker(spec: RestaurantSpec, content: bytes, deep: bool = False):
+    """Parse one downloaded menu inside a pool process; no DB access here.
+
+    Returns the parse result, its duration and the profile of its stages.
+    """
+    # pool workers run tasks on their main thread, so SIGALRM can interrupt a stuck parse
+    use_alarm = hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.alarm(math.ceil(spec.timeout))
+    profile = IngestProfile(deep)
+    try:
+        start = time.perf_counter()
+        profile.start()
+        try:
+            parsed = spec.parser_cls(content).parse(profile)
+        finally:
+            profile.stop()
+        return parsed, time.perf_counter() - start, profile.to_dict()
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+
+
+def run_ingest(
+    specs,
+    job: UpdateJob | None = None,
+    max_workers: int = MAX_PARSE_WORKERS,
+    profile: bool = False,
+    state_file: Path = STATE_FILE,
+) -> dict:
+    """Fetch all sources, parse the changed ones in parallel, write serially.
+
+    Downloads stay in memory and are handed to the parsers as bytes.
+    Parsing runs in a process pool limited to `max_workers`; every result
+    is written through MenuWriter from this process, one at a time, so
+    SQLite only ever sees a single writer.
+
+    Returns the run report: wall/CPU time, allocations and item counts per
+    stage, for the run and for each restaurant, together with each
+    restaurant's final stage. The whole report is stored in ingest_reports
+    (its id is returned as "id"), and each parsed document's part with its
+    ingest_runs row. `profile=True` adds cProfile and tracemalloc output (see
+    backend.profiling). The conditional GET validators are read from and
+    stored in `state_file`.
+    """
+    job = job or UpdateJob()
+    specs = list(specs)
+    started_at = datetime.datetime.now()
+    run_profile = IngestProfile(profile)
+    run_profile.start()
+    wall, cpu = time.perf_counter(), time.process_time()
+    reports = {spec.name: {"stages": {}} for spec in specs}
+
+    for spec in specs:
+        job.stage(spec.name, "fetching")
+    with run_profile.stage("fetch") as s:
+        fetched = fetch_all_sync([spec.source for spec in specs], state_file=state_file)
+        s["items"] = len(fetched)
+        s["bytes"] = sum(result.size for result in fetched.values())
+    for result in fetched.values():
+        reports[result.name]["download"] = {
+            "status": result.status,
+            "bytes": result.size,
+            "wall": round(result.duration, 6),
+        }
+
+    ingested = []
+    workers = max(1, min(max_workers, len(specs)))
+    share = max(1, (os.cpu_count() or 1) // workers)
+    with run_profile.stage("process") as run_stage, ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(share,)
+    ) as pool:
+        pending = {}
+        for spec in specs:
+            result = fetched[spec.name]
+            if result.status == "failed":
+                reports[spec.name]["error"] = result.error
+                job.stage(spec.name, "failed", result.error)
+                continue
+            # a 304 means the stored menu is still current
+            if not result.changed:
+                job.stage(spec.name, "not_modified")
+                continue
+            source_profile = IngestProfile()
+            try:
+                with source_profile.stage("hash") as s:
+                    content_hash, page_count = document_info(result.content)
+                    s["items"] = page_count
+                    unchanged = already_parsed(spec.name, content_hash)
+            except Exception as e:
+                print(f"[Update Error] {spec.name}: {e}")
+                reports[spec.name]["error"] = str(e)
+                job.stage(spec.name, "failed", str(e))
+                continue
+            finally:
+                reports[spec.name]["stages"].update(source_profile.stages)
+            if unchanged:
+                print(f"{spec.name}: content unchanged, skipping parse")
+                job.stage(spec.name, "unchanged")
+                ingested.append(result)
+                continue
+            job.stage(spec.name, "parsing")
+            pending[pool.submit(parse_in_worker, spec, result.content, profile)] = (spec, content_hash, page_count)
+
+        for future in as_completed(pending):
+            spec, content_hash, page_count = pending[future]
+            report = reports[spec.name]
+            try:
+                (dishes, start, end), duration, parse_report = future.result()
+                report["stages"].update(parse_report["stages"])
+                if "details" in parse_report:
+                    report["details"] = parse_report["details"]
+                if not dishes:
+                    # a placeholder or a layout the parser does not understand yet: keep the stored
+                    # menu, and keep the document eligible so the next check (or a fixed parser) retries it
+                    print(f"{spec.name}: no dishes found, keeping stored menu")
+                    record_run(spec.name, content_hash, "empty", page_count, duration, 0, report)
+                    job.stage(spec.name, "empty")
+                    continue
+                job.stage(spec.name, "writing")
+                source_profile = IngestProfile()
+                with source_profile.stage("write") as s:
+                    counts = MenuWriter(spec.name).write(dishes, start, end, content_hash)
+                    rows = counts["inserted"] + counts["updated"] + counts["unchanged"]
+                    s["items"] = rows
+                    s["counts"] = counts
+                report["stages"].update(source_profile.stages)
+                run_stage["items"] = (run_stage["items"] or 0) + rows
+                record_run(spec.name, content_hash, "parsed", page_count, duration, rows, report)
+                job.stage(spec.name, "parsed")
+                ingested.append(fetched[spec.name])
+            except Exception as e:
+                print(f"[Update Error] {spec.name}: {e}")
+                report["error"] = str(e)
+                record_run(spec.name, content_hash, "failed", page_count, report=report)
+                job.stage(spec.name, "failed", str(e))
+
+    if ingested:
+        remember_validators(ingested, state_file)
+    run_profile.stop()
+
+    for name, entry in job.to_dict()["restaurants"].items():
+        reports[name]["stage"] = entry["stage"]
+    job.report = {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "wall": round(time.perf_counter() - wall, 6),
+        "cpu": round(time.process_time() - cpu, 6),
+        "profile": profile,
+        **run_profile.to_dict(),
+        "restaurants": reports,
+    }
+    try:
+        # failed downloads and 304s have no ingest_runs row; the run report covers them
+        job.report["id"] = save_report(job.report)
+    except Exception as e:
+        print(f"[Report Error] {e}")
+    return job.report
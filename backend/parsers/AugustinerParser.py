@@ -1,13 +1,18 @@
-import pdfplumber 
 import re 
 import datetime
-from backend.database import SessionLocal
-from backend.models import Speisen, Restaurant
+from backend.menu_writer import MenuWriter
+from backend.parsers.pdf_input import PdfInput, as_file, describe, open_pymupdf
+from backend.profiling import IngestProfile, stage
+
+ENGINES = ("pymupdf", "pdfplumber")
 
 
 class AugustinerParser:
-    def __init__(self, pdf_path: str):
-        self.pdf_path = pdf_path
+    def __init__(self, pdf: PdfInput, engine: str = "pymupdf"):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown extraction engine: {engine}")
+        self.pdf = pdf
+        self.engine = engine
         self.restaurant_name = "Augustiner"
 
 
@@ -32,15 +37,37 @@ class AugustinerParser:
         return text.strip()
 
     def read_pdf(self) -> str:
+        if self.engine == "pymupdf":
+            text = self.read_pdf_pymupdf()
+            if text.strip():
+                return text
+            # nothing extracted, let pdfplumber have a go before giving up
+            print(f"PyMuPDF found no text in {describe(self.pdf)}, falling back to pdfplumber")
+            if hasattr(self.pdf, "seek"):
+                self.pdf.seek(0)
+        return self.read_pdf_pdfplumber()
+
+    def read_pdf_pymupdf(self) -> str:
+        text = ""
+        with open_pymupdf(self.pdf) as doc:
+            for page in doc:
+                text += page.get_text("text", sort=True) + "\n"
+        return text
+
+    def read_pdf_pdfplumber(self) -> str:
+        import pdfplumber
+
         text = ""
-        with pdfplumber.open(self.pdf_path) as pdf:
+        with pdfplumber.open(as_file(self.pdf)) as pdf:
             for page in pdf.pages:
                 text += (page.extract_text() or "") + "\n"
         return text
 
 
     def process_menu(self, text: str) -> dict[str, list[str]]:
-        text = self.clean_text(text)
+        return self.split_sections(self.clean_text(text))
+
+    def split_sections(self, text: str) -> dict[str, list[str]]:
         sections = {}
 
         if "TAGESKARTE" in text:
@@ -62,18 +89,9 @@ class AugustinerParser:
         return structured
 
 
-    def write_to_db(self, menu: dict[str, list[str]]):
-        db = SessionLocal()
-
-        # Get or create Restaurant
-        restaurant = db.query(Restaurant).filter_by(Name=self.restaurant_name).first()
-        if not restaurant:
-            restaurant = Restaurant(Name=self.restaurant_name)
-            db.add(restaurant)
-            db.commit()
-            db.refresh(restaurant)
-
+    def to_dishes(self, menu: dict[str, list[str]]) -> tuple[list[tuple[datetime.date, str, float]], datetime.date, datetime.date]:
         today = datetime.date.today()
+        dishes = []
 
         for section, items in menu.items():
             for item in items:
@@ -86,24 +104,37 @@ class AugustinerParser:
                     name = item.strip()
                     price = 0.0
 
-                dish = Speisen(
-                    Name=name,
-                    Preis=price,
-                    Datum=today,
-                    r_ID=restaurant.r_ID,
-                )
-                db.add(dish)
+                dishes.append((today, name, price))
+
+        return dishes, today, today
+
+    def write_to_db(self, menu: dict[str, list[str]]) -> dict[str, int]:
+        return MenuWriter(self.restaurant_name).write(*self.to_dishes(menu))
 
-        db.commit()
-        db.close()
+    def parse(self, profile: IngestProfile | None = None) -> tuple[list[tuple[datetime.date, str, float]], datetime.date, datetime.date]:
+        """Everything but the DB write, so it can run in a worker process."""
+        with stage(profile, "extract") as s:
+            text = self.read_pdf()
+            s["items"] = len(text)  # characters
+        with stage(profile, "clean") as s:
+            text = self.clean_text(text)
+            s["items"] = len(text)
+        with stage(profile, "structure") as s:
+            menu = self.split_sections(text)
+            s["items"] = sum(len(items) for items in menu.values())
+        with stage(profile, "dishes") as s:
+            parsed = self.to_dishes(menu)
+            s["items"] = len(parsed[0])
+        return parsed
 
 
-    def run(self):
-        print(f"Parsing {self.pdf_path} ...")
+    def run(self) -> dict[str, int]:
+        print(f"Parsing {describe(self.pdf)} ...")
         text = self.read_pdf()
         menu = self.process_menu(text)
-        self.write_to_db(menu)
+        counts = self.write_to_db(menu)
         print(f"Completed parsing for {self.restaurant_name}")
+        return counts
 
 
 if __name__ == "__main__":
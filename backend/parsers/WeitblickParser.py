@@ -1,51 +1,290 @@
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
 import pymupdf
 import re
 import datetime
-from backend.database import SessionLocal
-from backend.models import Speisen, Restaurant
+from pathlib import Path
+from backend.menu_writer import MenuWriter
+from backend.parsers import pdf_input
+from backend.parsers.pdf_input import PdfInput, open_pymupdf
+from backend.profiling import IngestProfile, stage
+from backend.scripts.fetcher import MENU_DIR
+
+WEEKDAYS = ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag"]
+
+# resolved column rectangles per layout fingerprint, shared by all runs
+LAYOUT_CACHE = MENU_DIR / "weitblick_layouts.json"
+MAX_CACHED_LAYOUTS = 20
+ANCHOR_TOLERANCE = 2.0  # pt a cached anchor may move before the layout counts as new
+SINGLE_COLUMN_HALF_WIDTH = 76  # only used when there is no second anchor to measure against
+MAX_PAGE_WORKERS = 4
+
+MONTHS = {
+    "januar": 1, "februar": 2, "märz": 3, "maerz": 3, "april": 4, "mai": 5, "juni": 6,
+    "juli": 7, "august": 8, "september": 9, "oktober": 10, "november": 11, "dezember": 12,
+}
+NUMERIC_DATE = re.compile(r"\b(\d{1,2})\.\s?(\d{1,2})\.(?:\s?(\d{4}|\d{2})\b)?")
+NAMED_DATE = re.compile(r"\b(\d{1,2})\.\s*(" + "|".join(MONTHS) + r")\b(?:\s*(\d{4}))?", re.IGNORECASE)
+CALENDAR_WEEK = re.compile(r"\bKW\s*(\d{1,2})\b", re.IGNORECASE)
+YEAR = re.compile(r"\b(20\d{2})\b")
+
+
+def _closest(candidates, today: datetime.date) -> datetime.date | None:
+    dates = [day for day in candidates if day is not None]
+    return min(dates, key=lambda day: abs(day - today), default=None)
+
+
+def _date(year: int, month: int, day: int) -> datetime.date | None:
+    try:
+        return datetime.date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _iso_monday(year: int, week: int) -> datetime.date | None:
+    try:
+        return datetime.date.fromisocalendar(year, week, 1)
+    except ValueError:
+        return None
+
+
+def week_start(text: str, today: datetime.date | None = None) -> datetime.date | None:
+    """Monday of the week a card header like "13.10. - 17.10.2025", "KW 42" or
+    "13. Oktober 2025" refers to, or None if it names no date.
+
+    Without a printed year the one that puts the date closest to `today` is
+    taken, so a card for early January read in December lands in January:
+
+    >>> week_start("05.01. - 09.01.", datetime.date(2025, 12, 29))
+    datetime.date(2026, 1, 5)
+    >>> week_start("29.12. - 02.01.2026", datetime.date(2025, 12, 27))
+    datetime.date(2025, 12, 29)
+    >>> week_start("KW 52", datetime.date(2026, 1, 2))
+    datetime.date(2025, 12, 22)
+    """
+    today = today or datetime.date.today()
+    years = (today.year - 1, today.year, today.year + 1)
+    dates = [(int(d), int(m), y) for d, m, y in NUMERIC_DATE.findall(text)]
+    dates += [(int(d), MONTHS[m.lower()], y) for d, m, y in NAMED_DATE.findall(text)]
+    for i, (day, month, year) in enumerate(dates):
+        # "13.10. - 17.10.2025": the year comes with a later date
+        later = [(m, y) for _, m, y in dates[i:] if y]
+        if later:
+            year = int(later[0][1])
+            year += 2000 if year < 100 else 0
+            if month > later[0][0]:  # "29.12. - 02.01.2026"
+                year -= 1
+            date = _date(year, month, day)
+        else:
+            date = _closest((_date(year, month, day) for year in years), today)
+        if date is None:
+            continue
+        return date - datetime.timedelta(days=date.weekday())
+    week = CALENDAR_WEEK.search(text)
+    if week:
+        year = YEAR.search(text)
+        if year:
+            return _iso_monday(int(year.group(1)), int(week.group(1)))
+        return _closest((_iso_monday(year, int(week.group(1))) for year in years), today)
+    return None
+
+
+def parse_page(pdf: PdfInput, page: int, layout_cache: Path | None, profile: bool):
+    """Parse one page in a worker process; returns its dishes and stage records."""
+    page_profile = IngestProfile() if profile else None
+    dishes = WeitblickParser(pdf, layout_cache=layout_cache, page=page).parse_page(page_profile)
+    return dishes, page_profile.stages if page_profile else {}
 
 
 class WeitblickParser:
-    def __init__(self, pdf_path: str, debug: bool = False):
-        self.pdf_path = pdf_path
+    def __init__(self, pdf: PdfInput, debug: bool = False, layout_cache: Path | None = LAYOUT_CACHE, page: int = 0):
+        self.pdf = pdf
+        self.page = page
         self.restaurant_name = "Weitblick"
         self.debug = debug
-        
+        self.layout_cache = layout_cache
+        self.words = None
+        self.word_index = {}
+        self.page_size = None
+        self.layout = None  # "cached" or "detected" once layout_rects() ran
+        self.columns = []  # weekday of each rectangle layout_rects() returned
+        self.footer = None  # (text, x0, y0) of the first word of the line that ends the columns
+
+    def load_words(self):
+        """Open the document once, extract the page's words and close it again.
+
+        Builds `self.words` (x0, y0, x1, y1, text, block, line, word) and
+        `self.word_index`, which maps each lower-cased word (without trailing
+        punctuation) to its entries.
+        """
+        with open_pymupdf(self.pdf) as doc:
+            page = doc[self.page]
+            self.words = page.get_text("words")
+            self.page_size = (round(page.rect.width, 1), round(page.rect.height, 1))
+        self.word_index = {}
+        for word in self.words:
+            self.word_index.setdefault(word[4].strip(".,:;").lower(), []).append(word)
+        return self.words
+
     def read_rectangles(self, rects):
-        doc = pymupdf.open(self.pdf_path)
-        page = doc[0]
+        if self.words is None:
+            self.load_words()
         menu = []
         for rect in rects:
-            text = page.get_textbox(rect)
-            menu.append(text)
+            lines = {}
+            for x0, y0, x1, y1, text, block, line, _ in self.words:
+                cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+                if rect.x0 <= cx <= rect.x1 and rect.y0 <= cy <= rect.y1:
+                    lines.setdefault((block, line), []).append(text)
+            menu.append("\n".join(" ".join(words) for words in lines.values()))
         return menu
 
-    def get_anchors(self):
-        WEEKDAYS = ["Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag"]
-        doc = pymupdf.open(self.pdf_path)
-        page = doc[0]
+    def find_anchors(self) -> list[tuple[str, float, float]]:
+        """(weekday, centre x, bottom y) of the weekday headings, in WEEKDAYS order."""
+        if self.words is None:
+            self.load_words()
         all_y0 = []
         all = []
         res = []
         for day in WEEKDAYS:
-            matches = page.search_for(day)
-            for i, match in enumerate(matches):
-                all.append(match)
-                all_y0.append(match.y0)
+            for match in self.word_index.get(day.lower(), []):
+                all.append((day, match))
+                all_y0.append(match[1])
+        if not all:
+            return res  # a page without a weekday grid, e.g. drinks or events
         avg_y0 = sum(all_y0) / len(all_y0)
-        for match in all:
-            if -10 < (match.y0 - avg_y0) < 10:
-                tmp = ((match.x0 + match.x1) / 2, match.y1)
-                res.append(tmp)
+        for day, (x0, y0, x1, y1, *_) in all:
+            if -10 < (y0 - avg_y0) < 10:
+                res.append((day, (x0 + x1) / 2, y1))
         return res
 
+    def get_anchors(self):
+        return [(x, y) for _, x, y in self.find_anchors()]
+
+    def content_bottom(self, anchors, bounds) -> float:
+        """Bottom edge of the columns.
+
+        Lines below the weekday row that fit inside one column are menu text;
+        the first line after the last of them that does not (a footer
+        spanning several columns) ends the columns. Without one, the columns
+        reach the bottom of the page.
+        """
+        top = max(y for _, y in anchors)
+        lines = {}
+        for word in self.words:
+            x0, y0, x1, y1, _, block, line, _ = word
+            if y0 > top:
+                extent = lines.setdefault((block, line), [x0, y0, x1, y1, word])
+                extent[:4] = min(extent[0], x0), min(extent[1], y0), max(extent[2], x1), max(extent[3], y1)
+        columns = list(zip(bounds, bounds[1:]))
+        inside = [y1 for x0, _, x1, y1, _ in lines.values() if any(a <= x0 and x1 <= b for a, b in columns)]
+        last_menu_line = max(inside, default=top)
+        footer = [
+            (y0, first) for x0, y0, x1, _, first in lines.values()
+            if y0 > last_menu_line and not any(a <= x0 and x1 <= b for a, b in columns)
+        ]
+        if not footer:
+            self.footer = None
+            return self.page_size[1]
+        y0, first = min(footer)
+        self.footer = (first[4], first[0], first[1])
+        return y0 - 1
+
     def build_rects(self, anchors):
+        """One column per anchor, reaching halfway to the neighbouring anchors."""
+        if self.words is None:
+            self.load_words()
+        order = sorted(x for x, _ in anchors)
+        if len(order) > 1:
+            gaps = [b - a for a, b in zip(order, order[1:])]
+            bounds = [order[0] - gaps[0] / 2] + [a + gap / 2 for a, gap in zip(order, gaps)] + [order[-1] + gaps[-1] / 2]
+        else:
+            bounds = [order[0] - SINGLE_COLUMN_HALF_WIDTH, order[0] + SINGLE_COLUMN_HALF_WIDTH]
+        bottom = self.content_bottom(anchors, bounds)
         res = []
-        for anchor in anchors:
-            tmp = pymupdf.Rect(int(anchor[0]) - 76, int(anchor[1]) + 1, int(anchor[0]) + 76, 497)
-            res.append(tmp)
+        for x, y in anchors:
+            i = order.index(x)
+            res.append(pymupdf.Rect(bounds[i], y + 1, bounds[i + 1], bottom))
         return res
 
+    def fingerprint(self, anchors) -> str:
+        footer = self.footer and (self.footer[0], round(self.footer[1]), round(self.footer[2]))
+        key = [self.page_size, [(day, round(x), round(y)) for day, x, y in anchors], footer]
+        return hashlib.sha1(json.dumps(key).encode()).hexdigest()[:16]
+
+    def load_templates(self) -> dict:
+        if self.layout_cache is None:
+            return {}
+        try:
+            return json.loads(Path(self.layout_cache).read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def save_template(self, templates: dict, fingerprint: str, anchors, rects):
+        if self.layout_cache is None:
+            return
+        templates.pop(fingerprint, None)
+        templates[fingerprint] = {
+            "page_size": self.page_size,
+            "anchors": anchors,
+            "footer": self.footer,
+            "rects": [tuple(rect) for rect in rects],
+        }
+        while len(templates) > MAX_CACHED_LAYOUTS:
+            templates.pop(next(iter(templates)))
+        path = Path(self.layout_cache)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # pages are parsed in parallel; never let another process read a half-written file
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(templates, indent=2))
+        os.replace(tmp, path)
+
+    def matches(self, template: dict, anchors) -> bool:
+        """Whether the page has exactly the template's weekday headings, each
+        where the template expects it, and the footer that ends the columns."""
+        if tuple(template["page_size"]) != self.page_size:
+            return False
+        # a holiday week drops a weekday; a normal card must not reuse its narrower grid, nor the reverse
+        if [day for day, _, _ in template["anchors"]] != [day for day, _, _ in anchors]:
+            return False
+        for (_, x, y), (_, ax, ay) in zip(template["anchors"], anchors):
+            if abs(ax - x) > ANCHOR_TOLERANCE or abs(ay - y) > ANCHOR_TOLERANCE:
+                return False
+        if template["footer"]:
+            # a longer card pushes the footer down; the cached bottom edge would cut it off
+            text, x, y = template["footer"]
+            if not any(
+                abs(x0 - x) <= ANCHOR_TOLERANCE and abs(y0 - y) <= ANCHOR_TOLERANCE
+                for x0, y0, *_ in self.word_index.get(text.strip(".,:;").lower(), [])
+            ):
+                return False
+        return True
+
+    def layout_rects(self):
+        """Column rectangles from a cached template, or detected and cached.
+
+        Sets `self.columns` to the weekday of each rectangle.
+        """
+        if self.words is None:
+            self.load_words()
+        anchors = self.find_anchors()
+        self.columns = [day for day, _, _ in anchors]
+        if not anchors:
+            self.layout = "none"
+            return []
+        templates = self.load_templates()
+        for template in templates.values():
+            if self.matches(template, anchors):
+                self.layout = "cached"
+                return [pymupdf.Rect(rect) for rect in template["rects"]]
+        rects = self.build_rects([(x, y) for _, x, y in anchors])
+        self.save_template(templates, self.fingerprint(anchors), anchors, rects)
+        self.layout = "detected"
+        return rects
+
     def cleanup_menu(self, day_menus):
         structured_menu = {}
         pattern = r"(.*?\d{1,3}(?:[.,]\d{2})\s*€?)"
@@ -73,36 +312,105 @@ class WeitblickParser:
         name = s[: m.start()].strip()
         return name, price
 
-    def write_to_db(self, menu: dict[int, list[str]]):
-        db = SessionLocal()
-        restaurant = db.query(Restaurant).filter_by(Name=self.restaurant_name).first()
-        if not restaurant:
-            restaurant = Restaurant(Name=self.restaurant_name)
-            db.add(restaurant)
-            db.commit()
-            db.refresh(restaurant)
+    def header_text(self) -> str:
+        """The page's text above the weekday row (all of it if there is none)."""
+        if self.words is None:
+            self.load_words()
+        anchors = self.find_anchors()
+        top = min((y for _, _, y in anchors), default=None)
+        return " ".join(word[4] for word in self.words if top is None or word[3] <= top)
+
+    def week_start(self) -> datetime.date:
+        """Monday of the week on this page's header; the page's offset from the
+        current week if the header names no date."""
+        monday = week_start(self.header_text())
+        if monday is None:
+            today = datetime.date.today()
+            monday = today - datetime.timedelta(days=today.weekday(), weeks=-self.page)
+            print(f"No week date found on page {self.page + 1} of the Weitblick card, assuming {monday}")
+        return monday
+
+    def to_dishes(self, menu: dict[int, list[str]], monday: datetime.date | None = None, columns: list[str] | None = None) -> tuple[list[tuple[datetime.date, str, float]], datetime.date, datetime.date]:
+        """`columns` names the weekday of each menu column; without it the
+        columns are taken as Monday to Friday."""
+        if monday is None:
+            today = datetime.date.today()
+            monday = today - datetime.timedelta(days=today.weekday())
+        dishes = []
 
         for i, items in menu.items():
+            offset = WEEKDAYS.index(columns[i]) if columns else i
             for item in items:
                 name, price = self.split_name_price(item)
-                today = datetime.date.today()
-                dish_date =  today - datetime.timedelta(days=today.weekday()) + datetime.timedelta(days=i)
-                dish = Speisen(
-                    Name=name,
-                    Preis=price,
-                    Datum=dish_date,
-                    r_ID=restaurant.r_ID,
-                )
-                db.add(dish)
-
-        db.commit()
-        db.close()
-        print(f"Saved weekly menu for {self.restaurant_name}")
+                dish_date = monday + datetime.timedelta(days=offset)
+                dishes.append((dish_date, name, price))
+
+        return dishes, monday, monday + datetime.timedelta(days=4)
+
+    def parse_page(self, profile: IngestProfile | None = None) -> list[tuple[datetime.date, str, float]]:
+        with stage(profile, "extract") as s:
+            s["items"] = len(self.load_words())  # words
+        with stage(profile, "layout") as s:
+            day_menus = self.read_rectangles(self.layout_rects())
+            s["items"] = len(day_menus)
+            s["layout"] = self.layout
+        with stage(profile, "clean") as s:
+            menu = self.cleanup_menu(day_menus)
+            s["items"] = sum(len(items) for items in menu.values())
+        with stage(profile, "dishes") as s:
+            dishes = self.to_dishes(menu, self.week_start() if menu else None, self.columns)[0]
+            s["items"] = len(dishes)
+        return dishes
 
+    def parse(self, profile: IngestProfile | None = None) -> tuple[list[tuple[datetime.date, str, float]], datetime.date, datetime.date]:
+        """Everything but the DB write, so it can run in a worker process.
 
-    def run(self):
-        anchors = self.get_anchors()
-        self.write_to_db(self.cleanup_menu(self.read_rectangles(self.build_rects(anchors))))
+        Every page is parsed, in parallel worker processes when there are
+        several, and the dishes of all pages are returned as one batch
+        spanning all the weeks found.
+        """
+        if hasattr(self.pdf, "read"):
+            self.pdf = self.pdf.read()
+        with open_pymupdf(self.pdf) as doc:
+            page_count = doc.page_count
+
+        if page_count == 1:
+            dishes = self.parse_page(profile)
+        else:
+            dishes = []
+            jobs = [(self.pdf, page, self.layout_cache, profile is not None) for page in range(page_count)]
+            workers = min(page_count, MAX_PAGE_WORKERS, pdf_input.cpu_share)
+            with stage(profile, "pages") as s:
+                if workers == 1:
+                    pages = list(itertools.starmap(parse_page, jobs))
+                else:
+                    # Pool.__exit__ terminates the workers, so a parse timeout (SIGALRM in
+                    # the orchestrator) stops the page parses instead of waiting for them
+                    with multiprocessing.Pool(workers) as pool:
+                        pages = pool.starmap(parse_page, jobs)
+                for page_dishes, page_stages in pages:
+                    dishes += page_dishes
+                    if profile is not None:
+                        # per-stage totals over all pages
+                        for name, record in page_stages.items():
+                            total = profile.stages.setdefault(name, {"items": 0, "wall": 0.0, "cpu": 0.0, "alloc_blocks": 0})
+                            for key in ("items", "wall", "cpu", "alloc_blocks"):
+                                total[key] += record[key] or 0
+                s["items"] = page_count
+
+        if not dishes:
+            today = datetime.date.today()
+            monday = today - datetime.timedelta(days=today.weekday())
+            return dishes, monday, monday + datetime.timedelta(days=4)
+        days = [day for day, _, _ in dishes]
+        start = min(days)
+        start -= datetime.timedelta(days=start.weekday())
+        return dishes, start, max(days) - datetime.timedelta(days=max(days).weekday()) + datetime.timedelta(days=4)
+
+    def run(self) -> dict[str, int]:
+        counts = MenuWriter(self.restaurant_name).write(*self.parse())
+        print(f"Saved weekly menu for {self.restaurant_name}")
+        return counts
 
 
 if __name__ == "__main__":
@@ -0,0 +1,32 @@
+import io
+import os
+from pathlib import Path
+from typing import BinaryIO, Union
+import pymupdf
+
+# Parsers accept a path or the PDF itself, so the ingest never has to touch disk
+PdfInput = Union[str, Path, bytes, bytearray, memoryview, BinaryIO]
+
+# CPUs a single parse may spread its own worker processes over; the
+# orchestrator lowers it in each of its pool workers so nested pools together
+# stay within the machine's cores
+cpu_share = os.cpu_count() or 1
+
+
+def describe(pdf: PdfInput) -> str:
+    return str(pdf) if isinstance(pdf, (str, Path)) else "in-memory PDF"
+
+
+def open_pymupdf(pdf: PdfInput) -> pymupdf.Document:
+    if isinstance(pdf, (str, Path)):
+        return pymupdf.open(pdf)
+    if hasattr(pdf, "read"):
+        pdf = pdf.read()
+    return pymupdf.open(stream=pdf, filetype="pdf")
+
+
+def as_file(pdf: PdfInput):
+    """Something pdfplumber.open() accepts: a path or a seekable binary file."""
+    if isinstance(pdf, (str, Path)) or hasattr(pdf, "read"):
+        return pdf
+    return io.BytesIO(pdf)
@@ -0,0 +1,91 @@
+"""Weekly price statistics per restaurant, served by /stats.
+
+MenuWriter recomputes only the weeks it wrote, in the same transaction as the
+dishes, so /stats never aggregates over Speisen. Archived dishes count too, so
+retention does not change the numbers. Rebuild everything with:
+
+    python -m backend.price_stats
+"""
+import datetime
+from sqlalchemy import select, delete, union_all
+from sqlalchemy.orm import Session
+from backend.database import SessionLocal
+from backend.models import Speisen, SpeisenArchive, WeeklyPriceStats
+
+
+def week_of(day: datetime.date) -> datetime.date:
+    return day - datetime.timedelta(days=day.weekday())
+
+
+def _dish_prices(r_id: int | None = None, start: datetime.date | None = None, end: datetime.date | None = None):
+    queries = []
+    for table in (Speisen, SpeisenArchive):
+        query = select(table.r_ID, table.Datum, table.Preis)
+        if r_id is not None:
+            query = query.where(table.r_ID == r_id)
+        if start is not None:
+            query = query.where(table.Datum.between(start, end))
+        queries.append(query)
+    return union_all(*queries)
+
+
+def _write_buckets(db: Session, prices) -> int:
+    buckets = {}
+    for r_id, datum, preis in prices:
+        buckets.setdefault((r_id, week_of(datum)), []).append(preis)
+    now = datetime.datetime.now()
+    rows = [
+        {
+            "r_ID": r_id,
+            "week": week,
+            "dish_count": len(values),
+            "avg_preis": round(sum(values) / len(values), 2),
+            "min_preis": min(values),
+            "max_preis": max(values),
+            "updated_at": now,
+        }
+        for (r_id, week), values in buckets.items()
+    ]
+    if rows:
+        db.execute(WeeklyPriceStats.__table__.insert(), rows)
+    return len(rows)
+
+
+def update_weeks(db: Session, r_id: int, start: datetime.date, end: datetime.date) -> int:
+    """Recompute the weeks of `r_id` that overlap `start`..`end`; the caller commits."""
+    first, last = week_of(start), week_of(end)
+    db.execute(
+        delete(WeeklyPriceStats).where(WeeklyPriceStats.r_ID == r_id, WeeklyPriceStats.week.between(first, last))
+    )
+    return _write_buckets(db, db.execute(_dish_prices(r_id, first, last + datetime.timedelta(days=6))))
+
+
+def stats_query(r_ids, start: datetime.date | None = None, end: datetime.date | None = None):
+    query = select(
+        WeeklyPriceStats.r_ID,
+        WeeklyPriceStats.week,
+        WeeklyPriceStats.dish_count,
+        WeeklyPriceStats.avg_preis,
+        WeeklyPriceStats.min_preis,
+        WeeklyPriceStats.max_preis,
+    ).where(WeeklyPriceStats.r_ID.in_(r_ids))
+    if start is not None:
+        query = query.where(WeeklyPriceStats.week >= week_of(start))
+    if end is not None:
+        query = query.where(WeeklyPriceStats.week <= end)
+    return query.order_by(WeeklyPriceStats.r_ID, WeeklyPriceStats.week)
+
+
+def rebuild_stats() -> int:
+    db = SessionLocal()
+    try:
+        db.execute(delete(WeeklyPriceStats))
+        written = _write_buckets(db, db.execute(_dish_prices()))
+        db.commit()
+        return written
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print(f"Wrote {rebuild_stats()} weekly price buckets")
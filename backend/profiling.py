@@ -0,0 +1,83 @@
+"""Per-stage measurements for ingest runs.
+
+Every stage records wall time, CPU time of the process, the change in live
+Python memory blocks, and an item count that the stage fills in itself (pages,
+words, dishes, rows...). All of this is cheap enough to run on every ingest.
+
+With `deep=True` the profile also runs cProfile and tracemalloc. It then adds
+each stage's peak traced memory and, in `details`, the top functions by
+cumulative time and the top allocation sites. That costs a multiple of the
+normal run time, so it is opt-in (`--profile` on the CLI entry points).
+"""
+import cProfile
+import io
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 10
+
+
+class IngestProfile:
+    def __init__(self, deep: bool = False):
+        self.deep = deep
+        self.stages = {}
+        self.details = {}
+        self._profiler = None
+        self._owns_tracemalloc = False
+
+    @contextmanager
+    def stage(self, name: str):
+        """Measure the block; it may set `items` (and other fields) on the yielded dict."""
+        record = {"items": None}
+        if self.deep and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        blocks = sys.getallocatedblocks()
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["wall"] = round(time.perf_counter() - wall, 6)
+            record["cpu"] = round(time.process_time() - cpu, 6)
+            record["alloc_blocks"] = sys.getallocatedblocks() - blocks
+            if self.deep and tracemalloc.is_tracing():
+                record["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            self.stages[name] = record
+
+    def start(self):
+        if not self.deep:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def stop(self):
+        if self._profiler is None:
+            return
+        self._profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        self.details["cprofile"] = out.getvalue()
+        self.details["allocations"] = [
+            str(stat) for stat in tracemalloc.take_snapshot().statistics("lineno")[:TOP_ALLOCATIONS]
+        ]
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+        self._profiler = None
+
+    def to_dict(self) -> dict:
+        report = {"stages": self.stages}
+        if self.details:
+            report["details"] = self.details
+        return report
+
+
+def stage(profile: IngestProfile | None, name: str):
+    """`profile.stage(name)`, or a no-op when there is no profile."""
+    return profile.stage(name) if profile is not None else nullcontext({})
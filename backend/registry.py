@@ -0,0 +1,68 @@
+import datetime
+import importlib
+from dataclasses import dataclass, field
+from backend.scripts.fetcher import Source
+from backend.scripts.scraper_augustiner import AUGUSTINER_SOURCE
+from backend.scripts.scraper_weitblick import WEITBLICK_SOURCE
+
+
+@dataclass
+class Cadence:
+    """When a restaurant publishes a new card, for the update scheduler.
+
+    The card for a `period` ("day" or "week") is expected on one of
+    `weekdays` (0 = Monday) between `start` and `end`; inside that window the
+    scheduler re-checks every `retry_every` until the content has changed.
+    """
+
+    weekdays: tuple[int, ...]
+    start: datetime.time
+    end: datetime.time
+    period: str = "day"
+    retry_every: datetime.timedelta = datetime.timedelta(minutes=30)
+
+
+@dataclass
+class RestaurantSpec:
+    """How to fetch and parse one restaurant's menu.
+
+    `parser` is the "module:Class" path of the parser, imported only when
+    `parser_cls` is first used so that the API never loads the PDF libraries.
+    `parser_cls(pdf_bytes).parse(profile=None)` must return (dishes, start,
+    end) for MenuWriter, recording its stages on `profile` when given one.
+    """
+
+    name: str
+    source: Source
+    parser: str
+    timeout: float = 60.0  # seconds for the parse
+    cadence: Cadence = field(
+        default_factory=lambda: Cadence(tuple(range(5)), datetime.time(8), datetime.time(12))
+    )
+
+
+    @property
+    def parser_cls(self) -> type:
+        module, _, cls = self.parser.partition(":")
+        return getattr(importlib.import_module(module), cls)
+
+
+RESTAURANTS: dict[str, RestaurantSpec] = {}
+
+def register(spec: RestaurantSpec):
+    RESTAURANTS[spec.name] = spec
+
+
+register(RestaurantSpec(
+    "Augustiner", AUGUSTINER_SOURCE, "backend.parsers.AugustinerParser:AugustinerParser",
+    # daily Tageskarte, usually up before the lunch service
+    cadence=Cadence((0, 1, 2, 3, 4), datetime.time(8, 30), datetime.time(12, 0)),
+))
+register(RestaurantSpec(
+    "Weitblick", WEITBLICK_SOURCE, "backend.parsers.WeitblickParser:WeitblickParser",
+    # weekly card, published on Monday; keep retrying into Tuesday if it is late
+    cadence=Cadence(
+        (0, 1), datetime.time(7, 0), datetime.time(14, 0),
+        period="week", retry_every=datetime.timedelta(hours=1),
+    ),
+))
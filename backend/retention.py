@@ -0,0 +1,88 @@
+"""Keeps Speisen down to a hot window of recent weeks.
+
+Dishes older than RETENTION_WEEKS are moved to Speisen_archive (served by
+/archive) and their /menu snapshots are dropped, so /menu and /menus only ever
+touch the recent working set. After rows have been moved the database is
+compacted and its planner statistics refreshed. Run by hand with:
+
+    python -m backend.retention
+"""
+import datetime
+import os
+import time
+from sqlalchemy import select, delete, insert, text, literal
+from backend.database import SessionLocal, engine
+from backend.models import Speisen, SpeisenArchive, MenuSnapshot
+
+RETENTION_WEEKS = int(os.environ.get("RETENTION_WEEKS", "8"))
+
+
+def cutoff_date(today: datetime.date | None = None, weeks: int = RETENTION_WEEKS) -> datetime.date:
+    """First day that stays in Speisen: the Monday `weeks` weeks before this one."""
+    today = today or datetime.date.today()
+    return today - datetime.timedelta(days=today.weekday(), weeks=weeks)
+
+
+def archive_before(cutoff: datetime.date) -> int:
+    """Move dishes dated before `cutoff` to the archive in one transaction. Returns the row count."""
+    db = SessionLocal()
+    try:
+        moved = db.execute(
+            insert(SpeisenArchive).from_select(
+                ["s_ID", "Name", "Preis", "Datum", "r_ID", "archived_at"],
+                select(
+                    Speisen.s_ID,
+                    Speisen.Name,
+                    Speisen.Preis,
+                    Speisen.Datum,
+                    Speisen.r_ID,
+                    literal(datetime.datetime.now(), SpeisenArchive.archived_at.type),
+                ).where(Speisen.Datum < cutoff),
+            )
+        ).rowcount
+        if moved:
+            db.execute(delete(Speisen).where(Speisen.Datum < cutoff))
+        db.execute(delete(MenuSnapshot).where(MenuSnapshot.Datum < cutoff))
+        db.commit()
+        return moved
+    finally:
+        db.close()
+
+
+def compact():
+    """VACUUM and ANALYZE; both have to run outside a transaction."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if engine.dialect.name == "sqlite":
+            conn.execute(text("VACUUM"))
+            conn.execute(text("ANALYZE"))
+        else:
+            for table in (Speisen, MenuSnapshot, SpeisenArchive):
+                conn.execute(text(f'VACUUM ANALYZE "{table.__tablename__}"'))
+
+
+def run_retention(today: datetime.date | None = None, weeks: int = RETENTION_WEEKS, force_compact: bool = False) -> dict:
+    cutoff = cutoff_date(today, weeks)
+    started = time.perf_counter()
+    moved = archive_before(cutoff)
+    compacted = bool(moved) or force_compact
+    if compacted:
+        compact()
+    result = {
+        "cutoff": cutoff.isoformat(),
+        "archived": moved,
+        "compacted": compacted,
+        "duration": round(time.perf_counter() - started, 3),
+    }
+    if moved:
+        print(f"Archived {moved} dishes dated before {cutoff}")
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Move old dishes to Speisen_archive and compact the database")
+    parser.add_argument("--weeks", type=int, default=RETENTION_WEEKS, help="weeks to keep in Speisen")
+    parser.add_argument("--compact", action="store_true", help="VACUUM/ANALYZE even if nothing was archived")
+    args = parser.parse_args()
+    print(run_retention(weeks=args.weeks, force_compact=args.compact))
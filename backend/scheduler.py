@@ -0,0 +1,164 @@
+import asyncio
+import datetime
+import random
+from backend.ingest_ledger import changed_since
+from backend.registry import Cadence, RestaurantSpec
+
+MAX_BACKOFF = datetime.timedelta(hours=2)
+# how often a period whose windows closed without a new card is still checked
+LATE_CHECK_EVERY = datetime.timedelta(hours=2)
+
+
+def period_start(cadence: Cadence, now: datetime.datetime) -> datetime.datetime:
+    day = now.date()
+    if cadence.period == "week":
+        day -= datetime.timedelta(days=day.weekday())
+    return datetime.datetime.combine(day, datetime.time())
+
+
+def next_period_start(cadence: Cadence, now: datetime.datetime) -> datetime.datetime:
+    days = 7 if cadence.period == "week" else 1
+    return period_start(cadence, now) + datetime.timedelta(days=days)
+
+
+def first_window_after(cadence: Cadence, moment: datetime.datetime) -> datetime.datetime:
+    """The earliest time >= `moment` that lies inside a publication window."""
+    for offset in range(8):
+        day = moment.date() + datetime.timedelta(days=offset)
+        if day.weekday() not in cadence.weekdays:
+            continue
+        opens = datetime.datetime.combine(day, cadence.start)
+        closes = datetime.datetime.combine(day, cadence.end)
+        if moment < closes:
+            return max(moment, opens)
+    raise ValueError(f"Cadence has no publication window: {cadence}")
+
+
+class SourceState:
+    def __init__(self):
+        self.period = None  # start of the period the state below refers to
+        self.done = False  # new content already ingested for this period
+        self.failures = 0
+        self.next_run = None
+        self.last_outcome = None
+
+
+class UpdateScheduler:
+    """Triggers updates when each restaurant is expected to publish.
+
+    Inside a source's window it re-checks every `retry_every` (plus jitter)
+    until a new card has been parsed, then sleeps until the next period.
+    A period that has no card yet is checked once at startup, and after its
+    windows close every LATE_CHECK_EVERY until it ends. Failures back off
+    exponentially up to MAX_BACKOFF. `trigger(names)`
+    must start an update job for those restaurants and return it.
+    """
+
+    def __init__(self, specs, trigger, jitter: float = 300.0, clock=datetime.datetime.now):
+        self.specs: dict[str, RestaurantSpec] = {spec.name: spec for spec in specs}
+        self.trigger = trigger
+        self.jitter = jitter
+        self.clock = clock
+        self.states = {name: SourceState() for name in self.specs}
+        self._task = None
+
+    def _jitter(self) -> datetime.timedelta:
+        return datetime.timedelta(seconds=random.uniform(0, self.jitter))
+
+    def next_check(self, cadence: Cadence, moment: datetime.datetime, now: datetime.datetime) -> datetime.datetime:
+        """The next window at or after `moment`; while the current period still has
+        no new card and its windows are over, a late check instead."""
+        window = first_window_after(cadence, moment)
+        period_end = next_period_start(cadence, now)
+        if window >= period_end:
+            # published late (or the API was down during the window): keep looking at a slow pace
+            late = max(moment, now + LATE_CHECK_EVERY)
+            if late < period_end:
+                return late
+        return window
+
+    def refresh_period(self, name: str, now: datetime.datetime):
+        cadence = self.specs[name].cadence
+        state = self.states[name]
+        start = period_start(cadence, now)
+        if state.period == start:
+            return
+        # an update triggered by hand (or before a restart) may already have found this period's card;
+        # if the ledger cannot be read the period stays unset and the next tick asks again
+        done = changed_since(name, start)
+        state.period = start
+        state.failures = 0
+        state.done = done
+        if state.done:
+            state.next_run = first_window_after(cadence, next_period_start(cadence, now)) + self._jitter()
+        elif state.next_run is None or state.next_run < start:
+            # nothing yet for this period: check once right away, even if its windows are over
+            state.next_run = now + self._jitter()
+
+    def record(self, name: str, stage: str | None, now: datetime.datetime):
+        """Plan the next check of `name` after a check that ended in `stage`."""
+        cadence = self.specs[name].cadence
+        state = self.states[name]
+        state.last_outcome = stage
+        if stage == "parsed":
+            state.done = True
+            state.failures = 0
+            state.next_run = first_window_after(cadence, next_period_start(cadence, now)) + self._jitter()
+        elif stage == "failed":
+            state.failures += 1
+            backoff = min(cadence.retry_every * 2 ** (state.failures - 1), MAX_BACKOFF)
+            state.next_run = self.next_check(cadence, now + backoff, now) + self._jitter()
+        else:
+            # not published yet (304, identical content, or a card without dishes)
+            state.failures = 0
+            state.next_run = self.next_check(cadence, now + cadence.retry_every, now) + self._jitter()
+
+    async def tick(self) -> float:
+        """Run every due check once; returns seconds until the next one."""
+        now = self.clock()
+        for name in self.states:
+            # may hit the ingest ledger, keep it off the event loop
+            await asyncio.to_thread(self.refresh_period, name, now)
+        due = [name for name, state in self.states.items() if state.next_run <= now]
+        if due:
+            print(f"[Scheduler] checking {', '.join(due)}")
+            job, _ = self.trigger(due)
+            await asyncio.to_thread(job.finished.wait)
+            restaurants = job.to_dict()["restaurants"]
+            now = self.clock()
+            for name in due:
+                self.record(name, restaurants.get(name, {}).get("stage"), now)
+        wait = min(state.next_run for state in self.states.values()) - self.clock()
+        # wake up at least once a minute so period changes and clock jumps are noticed
+        return min(max(wait.total_seconds(), 1.0), 60.0)
+
+    async def run(self):
+        while True:
+            try:
+                delay = await self.tick()
+            except Exception as e:
+                print(f"[Scheduler Error] {e}")
+                delay = 60.0
+            await asyncio.sleep(delay)
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def status(self) -> dict:
+        return {
+            name: {
+                "next_run": state.next_run,
+                "done_for_period": state.done,
+                "failures": state.failures,
+                "last_outcome": state.last_outcome,
+            }
+            for name, state in self.states.items()
+        }
@@ -0,0 +1,64 @@
+"""Check that both AugustinerParser engines parse a corpus of Tageskarten identically.
+
+    python -m backend.scripts.augustiner_parity [PDF or directory ...]
+
+Without arguments every PDF under backend/menus/corpus is checked. Exits
+with status 1 if any card yields different dishes or prices.
+"""
+import sys
+import time
+from pathlib import Path
+from backend.parsers.AugustinerParser import AugustinerParser, ENGINES
+from backend.scripts.fetcher import MENU_DIR
+
+CORPUS_DIR = MENU_DIR / "corpus"
+
+
+def collect(paths: list[str]) -> list[Path]:
+    pdfs = []
+    for path in map(Path, paths or [CORPUS_DIR]):
+        pdfs.extend(sorted(path.glob("*.pdf")) if path.is_dir() else [path])
+    return pdfs
+
+
+def parse_with(engine: str, pdf: Path) -> tuple[list[tuple[str, float]], float]:
+    parser = AugustinerParser(str(pdf), engine=engine)
+    start = time.perf_counter()
+    dishes, _, _ = parser.to_dishes(parser.process_menu(parser.read_pdf()))
+    return [(name, price) for _, name, price in dishes], time.perf_counter() - start
+
+
+def main(argv: list[str]) -> int:
+    pdfs = collect(argv)
+    if not pdfs:
+        print(f"No PDFs found (default corpus: {CORPUS_DIR})")
+        return 1
+
+    totals = dict.fromkeys(ENGINES, 0.0)
+    mismatches = 0
+    for pdf in pdfs:
+        results = {}
+        for engine in ENGINES:
+            try:
+                results[engine], duration = parse_with(engine, pdf)
+                totals[engine] += duration
+            except Exception as e:
+                results[engine] = f"error: {e}"
+
+        reference = results[ENGINES[-1]]
+        if all(result == reference for result in results.values()):
+            print(f"OK        {pdf.name}")
+            continue
+        mismatches += 1
+        print(f"MISMATCH  {pdf.name}")
+        for engine, result in results.items():
+            print(f"  {engine}: {result}")
+
+    print(f"\n{len(pdfs) - mismatches}/{len(pdfs)} identical")
+    for engine, total in totals.items():
+        print(f"{engine}: {total / len(pdfs) * 1000:.1f} ms/card")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
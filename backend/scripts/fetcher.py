@@ -0,0 +1,130 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import httpx  # imported lazily in fetch_all
+
+MENU_DIR = Path(__file__).resolve().parent.parent / "menus"
+# conditional GET validators; point FETCH_STATE_FILE elsewhere to keep test runs off the real one
+STATE_FILE = Path(os.environ.get("FETCH_STATE_FILE", MENU_DIR / "fetch_state.json"))
+MAX_PDF_BYTES = 20 * 1024 * 1024
+
+
+@dataclass
+class Source:
+    name: str
+    url: str
+
+
+@dataclass
+class FetchResult:
+    name: str
+    status: str  # "downloaded", "not_modified" or "failed"
+    content: bytes | None = None
+    error: str | None = None
+    validators: dict = field(default_factory=dict)  # ETag / Last-Modified of this response
+    duration: float = 0.0  # seconds
+
+    @property
+    def changed(self) -> bool:
+        return self.status == "downloaded"
+
+    @property
+    def size(self) -> int:
+        return len(self.content) if self.content else 0
+
+
+def load_state(state_file: Path = STATE_FILE) -> dict:
+    try:
+        return json.loads(state_file.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def remember_validators(results, state_file: Path = STATE_FILE):
+    """Store the validators of `results` for the next conditional GET.
+
+    Only call this once a download has been ingested: a 304 skips the whole
+    pipeline, so validators of a failed parse must not be kept.
+    """
+    state = load_state(state_file)
+    for result in results:
+        if result.changed:
+            state[result.name] = result.validators
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    state_file.write_text(json.dumps(state, indent=2))
+
+
+async def fetch_source(client: "httpx.AsyncClient", source: Source, validators: dict, max_bytes: int) -> FetchResult:
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    print(f"Downloading {source.name} from {source.url}")
+    started = time.perf_counter()
+    try:
+        async with client.stream("GET", source.url, headers=headers) as response:
+            if response.status_code == 304:
+                print(f"{source.name} not modified")
+                return FetchResult(
+                    source.name, "not_modified", validators=validators, duration=time.perf_counter() - started
+                )
+            response.raise_for_status()
+
+            length = response.headers.get("Content-Length")
+            if length and int(length) > max_bytes:
+                raise ValueError(f"{length} bytes exceeds limit of {max_bytes}")
+
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) > max_bytes:
+                    raise ValueError(f"body exceeds limit of {max_bytes} bytes")
+
+            new_validators = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+        print(f"Fetched {source.name} ({len(body)} bytes)")
+        return FetchResult(
+            source.name, "downloaded", bytes(body), validators=new_validators, duration=time.perf_counter() - started
+        )
+    except Exception as e:
+        print(f"Failed to fetch {source.name}: {e}")
+        return FetchResult(
+            source.name, "failed", error=str(e), validators=validators, duration=time.perf_counter() - started
+        )
+
+
+async def fetch_all(
+    sources: list[Source],
+    state_file: Path = STATE_FILE,
+    max_bytes: int = MAX_PDF_BYTES,
+    timeout: float = 10.0,
+) -> dict[str, FetchResult]:
+    """Download all sources concurrently over one pooled keep-alive client.
+
+    Bodies are kept in memory; nothing but the small validator state file
+    is ever read from disk.
+    """
+    # imported here so that importing Source (the API does) does not load httpx
+    import httpx
+
+    state = load_state(state_file)
+    limits = httpx.Limits(max_connections=10, max_keepalive_connections=10)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits, follow_redirects=True) as client:
+        fetched = await asyncio.gather(
+            *(fetch_source(client, source, state.get(source.name, {}), max_bytes) for source in sources)
+        )
+    return {result.name: result for result in fetched}
+
+
+def fetch_all_sync(sources: list[Source], **kwargs) -> dict[str, FetchResult]:
+    return asyncio.run(fetch_all(sources, **kwargs))
@@ -1,21 +1,19 @@
-import requests
-from pathlib import Path
+import datetime
+from backend.scripts.fetcher import MENU_DIR, Source, FetchResult, fetch_all_sync
 
-def download_augustiner_menu():
-    url = "https://neuhauser-augustiner.com/speisekarten/Tageskarte.pdf"
-    menu_dir = Path(__file__).resolve().parent.parent / "menus"
-    menu_dir.mkdir(exist_ok=True)
-    target = menu_dir / "TageskarteAugustiner.pdf"
+AUGUSTINER_SOURCE = Source(
+    "Augustiner",
+    "https://neuhauser-augustiner.com/speisekarten/Tageskarte.pdf",
+)
 
-    print(f"Downloading Augustiner Tageskarte from {url}")
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        with open(target, "wb") as f:
-            f.write(response.content)
-        print(f"Saved {target.name}")
-    except Exception as e:
-        print(f"Failed to fetch Tageskarte Augustiner: {e}")
+def download_augustiner_menu() -> FetchResult:
+    return fetch_all_sync([AUGUSTINER_SOURCE])[AUGUSTINER_SOURCE.name]
 
 if __name__ == "__main__":
-    download_augustiner_menu()
+    result = download_augustiner_menu()
+    if result.changed:
+        # keep a copy for running the parser by hand, and one for the parity corpus
+        corpus = MENU_DIR / "corpus"
+        corpus.mkdir(parents=True, exist_ok=True)
+        (MENU_DIR / "TageskarteAugustiner.pdf").write_bytes(result.content)
+        (corpus / f"Tageskarte-{datetime.date.today()}.pdf").write_bytes(result.content)
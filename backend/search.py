@@ -0,0 +1,116 @@
+"""Dish name search over the full history, hot and archived.
+
+`dish_search` holds one row per dish and day with a normalized copy of the
+name: lowercased, umlauts spelled out (ä → ae, ß → ss). It is a trigram index
+(SQLite FTS5 `trigram` tokenizer, pg_trgm on PostgreSQL), so a term matches
+anywhere in a compound word: "braten" finds "Schweinebraten", and "Käse" and
+"Kaese" find each other.
+
+MenuWriter re-indexes every range it writes in the same transaction. Retention
+leaves the index alone, so archived dishes stay searchable. Backfill or repair
+it with:
+
+    python -m backend.search
+"""
+import datetime
+import re
+from sqlalchemy import text, select, union_all
+from sqlalchemy.orm import Session
+from backend.database import SessionLocal
+from backend.models import Speisen, SpeisenArchive
+
+MIN_TERM_LENGTH = 3  # shortest term a trigram index can match
+
+_UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+
+_INSERT = text(
+    "INSERT INTO dish_search (name_norm, name, preis, datum, r_id) "
+    "VALUES (:name_norm, :name, :preis, :datum, :r_id)"
+)
+
+
+def normalize(name: str) -> str:
+    return " ".join(re.findall(r"\w+", name.lower().translate(_UMLAUTS)))
+
+
+def query_terms(query: str) -> list[str]:
+    return [term for term in normalize(query).split() if len(term) >= MIN_TERM_LENGTH]
+
+
+def _insert_rows(db: Session, dishes) -> int:
+    """`dishes` are (Name, Preis, Datum, r_ID) tuples."""
+    rows = [
+        {"name_norm": normalize(name), "name": name, "preis": preis, "datum": datum.isoformat(), "r_id": r_id}
+        for name, preis, datum, r_id in dishes
+    ]
+    if rows:
+        db.execute(_INSERT, rows)
+    return len(rows)
+
+
+def index_dishes(db: Session, r_id: int, start: datetime.date, end: datetime.date) -> int:
+    """Re-index the dishes of `r_id` between `start` and `end`; the caller commits."""
+    params = {"r_id": r_id, "start": start.isoformat(), "end": end.isoformat()}
+    db.execute(text("DELETE FROM dish_search WHERE r_id = :r_id AND datum BETWEEN :start AND :end"), params)
+    return _insert_rows(
+        db,
+        db.execute(
+            select(Speisen.Name, Speisen.Preis, Speisen.Datum, Speisen.r_ID)
+            .where(Speisen.r_ID == r_id, Speisen.Datum.between(start, end))
+        ),
+    )
+
+
+def search_query(dialect: str, terms: list[str], start=None, end=None, r_id=None, limit=50):
+    """Statement and parameters for a ranked search; best match first, then newest."""
+    # dates are text in the FTS5 table; asyncpg wants real dates
+    as_param = (lambda day: day) if dialect == "postgresql" else (lambda day: day.isoformat())
+    params = {"limit": limit}
+    filters = []
+    if start:
+        filters.append("datum >= :start")
+        params["start"] = as_param(start)
+    if end:
+        filters.append("datum <= :end")
+        params["end"] = as_param(end)
+    if r_id is not None:
+        filters.append("r_id = :r_id")
+        params["r_id"] = r_id
+
+    if dialect == "postgresql":
+        for i, term in enumerate(terms):
+            filters.append(f"name_norm LIKE :term{i}")
+            params[f"term{i}"] = f"%{term}%"
+        params["query"] = " ".join(terms)
+        sql = (
+            "SELECT name, preis, datum, r_id, similarity(name_norm, :query) AS score FROM dish_search "
+            f"WHERE {' AND '.join(filters)} ORDER BY score DESC, datum DESC LIMIT :limit"
+        )
+    else:
+        # every term as a quoted phrase, so FTS5 syntax in the input is inert
+        params["match"] = " ".join(f'"{term}"' for term in terms)
+        where = " AND ".join(["dish_search MATCH :match", *filters])
+        sql = (
+            "SELECT name, preis, datum, r_id, -bm25(dish_search) AS score FROM dish_search "
+            f"WHERE {where} ORDER BY score DESC, datum DESC LIMIT :limit"
+        )
+    return text(sql), params
+
+
+def rebuild_index() -> int:
+    db = SessionLocal()
+    try:
+        db.execute(text("DELETE FROM dish_search"))
+        dishes = union_all(
+            select(Speisen.Name, Speisen.Preis, Speisen.Datum, Speisen.r_ID),
+            select(SpeisenArchive.Name, SpeisenArchive.Preis, SpeisenArchive.Datum, SpeisenArchive.r_ID),
+        )
+        indexed = _insert_rows(db, db.execute(dishes))
+        db.commit()
+        return indexed
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print(f"Indexed {rebuild_index()} dishes")
@@ -0,0 +1,100 @@
+"""Pre-serialized /menu responses, one per (restaurant, day).
+
+MenuWriter rebuilds the snapshots of every day it touched in the same
+transaction as the dishes, so the API can return the stored bytes without
+loading any ORM objects. Backfill or repair them with:
+
+    python -m backend.snapshots
+"""
+import datetime
+import hashlib
+import orjson
+from sqlalchemy import select, delete, func
+from sqlalchemy.orm import Session
+from backend.database import SessionLocal
+from backend.models import Speisen, Restaurant, MenuSnapshot
+
+
+def serialize_menu(rows, r_id: int, restaurant_name: str) -> bytes:
+    """`rows` are (s_ID, Name, Preis, Datum) tuples, in /menu order."""
+    return orjson.dumps(
+        [
+            {
+                "s_ID": s_id,
+                "Name": name,
+                "Preis": preis,
+                "Datum": datum,
+                "r_ID": r_id,
+                "Restaurant": restaurant_name,
+            }
+            for s_id, name, preis, datum in rows
+        ]
+    )
+
+
+def make_etag(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def materialize(
+    db: Session,
+    r_id: int,
+    restaurant_name: str,
+    start: datetime.date,
+    end: datetime.date,
+    source_hash: str | None = None,
+) -> int:
+    """Rebuild the snapshots of `r_id` between `start` and `end`; the caller commits.
+
+    Days without dishes get no snapshot. Returns the number written.
+    """
+    by_day = {}
+    for s_id, name, preis, datum in db.execute(
+        select(Speisen.s_ID, Speisen.Name, Speisen.Preis, Speisen.Datum)
+        .where(Speisen.r_ID == r_id, Speisen.Datum.between(start, end))
+        .order_by(Speisen.Datum, Speisen.s_ID)
+    ):
+        by_day.setdefault(datum, []).append((s_id, name, preis, datum))
+
+    db.execute(delete(MenuSnapshot).where(MenuSnapshot.r_ID == r_id, MenuSnapshot.Datum.between(start, end)))
+    now = datetime.datetime.now()
+    snapshots = []
+    for datum, rows in by_day.items():
+        body = serialize_menu(rows, r_id, restaurant_name)
+        snapshots.append(
+            {
+                "r_ID": r_id,
+                "Datum": datum,
+                "body": body,
+                "etag": make_etag(body),
+                "source_hash": source_hash,
+                "created_at": now,
+            }
+        )
+    if snapshots:
+        db.execute(MenuSnapshot.__table__.insert(), snapshots)
+    return len(snapshots)
+
+
+def snapshot_query(r_id: int, day: datetime.date):
+    return select(MenuSnapshot.body, MenuSnapshot.etag, MenuSnapshot.created_at).where(MenuSnapshot.r_ID == r_id, MenuSnapshot.Datum == day)
+
+
+def rebuild_all() -> int:
+    db = SessionLocal()
+    try:
+        written = 0
+        for r_id, name in db.execute(select(Restaurant.r_ID, Restaurant.Name)).all():
+            first, last = db.execute(
+                select(func.min(Speisen.Datum), func.max(Speisen.Datum)).where(Speisen.r_ID == r_id)
+            ).one()
+            if first is not None:
+                written += materialize(db, r_id, name, first, last)
+        db.commit()
+        return written
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print(f"Wrote {rebuild_all()} menu snapshots")
@@ -1,12 +1,18 @@
-from backend.parsers.WeitblickParser import WeitblickParser
-from backend.scripts.scraper_weitblick import download_weitblick_menu
+from backend.orchestrator import run_ingest
+from backend.registry import RESTAURANTS
 
-def updateWeitblick():
+def updateWeitblick(profile: bool = False) -> dict | None:
     try:
-        download_weitblick_menu()
-        WeitblickParser("backend/menus/Wochenkarte.pdf").run()
+        return run_ingest([RESTAURANTS["Weitblick"]], profile=profile)
     except Exception as e:
         print(f"[Update Error] {e}")
 
 if __name__ == "__main__":
-    updateWeitblick()
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Fetch, parse and store the Weitblick menu")
+    parser.add_argument("--profile", action="store_true", help="add cProfile and tracemalloc output to the report")
+    report = updateWeitblick(parser.parse_args().profile)
+    if report:
+        print(json.dumps(report, indent=2, default=str))
@@ -26,3 +26,18 @@ export async function getMenu(restaurant: string, date?: string): Promise<Dish[]
   if (!res.ok) throw new Error("Failed to fetch menu");
   return res.json();
 }
+
+export type MenuRange = {
+  start: string;
+  end: string;
+  // restaurant name → ISO date → dishes; days without dishes are omitted
+  restaurants: Record<string, Record<string, Dish[]>>;
+};
+
+export async function getMenus(start: string, end: string, restaurants?: string[]): Promise<MenuRange> {
+  const params = new URLSearchParams({ start_str: start, end_str: end });
+  restaurants?.forEach((r) => params.append("restaurant_str", r));
+  const res = await fetch(`${API_BASE}/menus?${params}`);
+  if (!res.ok) throw new Error("Failed to fetch menus");
+  return res.json();
+}